@@ -60,6 +60,7 @@ export async function GET(
     const messagesFile = path.join(projectDir, '.messages.json')
     const progressFile = path.join(projectDir, '.research-progress.json')
     const activitiesFile = path.join(projectDir, '.activities.json')
+    const activitiesLogFile = path.join(projectDir, '.activities.jsonl')
     
     // Read progress file if it exists
     let progress = null
@@ -124,36 +125,55 @@ export async function GET(
       }
     }
     
-    // Also read .activities.json if it exists (for tool calls/thoughts during resume)
+    // Also read activity files if they exist (for tool calls/thoughts during resume).
+    // The agent appends one JSON object per line to .activities.jsonl; projects
+    // from older agents may still have a .activities.json array.
+    const fileActivities: any[] = []
     try {
-      const activitiesContent = await fs.readFile(activitiesFile, 'utf-8')
-      const fileActivities = JSON.parse(activitiesContent)
-      
-      if (agentsWithActivities.length > 0 && Array.isArray(fileActivities)) {
-        // Convert file activities to database activity format
-        const convertedActivities = fileActivities.map((act: any) => ({
-          id: act.id || `file-${Date.now()}-${Math.random()}`,
-          agentId: agentsWithActivities[0].id,
-          timestamp: new Date(act.timestamp).getTime(),
-          action: act.type, // 'tool_call', 'thought', 'tool_result'
-          description: act.type === 'tool_call' ? `Calling tool: ${act.tool}` : 
-                      act.type === 'thought' ? act.content :
-                      act.type === 'tool_result' ? 'Tool output received' : act.type,
-          metadata: act
-        }))
-        
-        // Append and sort
-        agentsWithActivities[0].activities = [
-          ...agentsWithActivities[0].activities,
-          ...convertedActivities
-        ].sort((a, b) => a.timestamp - b.timestamp)
+      const legacyActivities = JSON.parse(await fs.readFile(activitiesFile, 'utf-8'))
+      if (Array.isArray(legacyActivities)) {
+        fileActivities.push(...legacyActivities)
       }
     } catch (err) {
-      // No activities file - that's okay
       if ((err as any).code !== 'ENOENT') {
         console.error('Error reading .activities.json:', err)
       }
     }
+    try {
+      const activitiesLog = await fs.readFile(activitiesLogFile, 'utf-8')
+      for (const line of activitiesLog.split('\n')) {
+        if (!line.trim()) continue
+        try {
+          fileActivities.push(JSON.parse(line))
+        } catch {
+          // Line still being written by the agent - pick it up next time
+        }
+      }
+    } catch (err) {
+      if ((err as any).code !== 'ENOENT') {
+        console.error('Error reading .activities.jsonl:', err)
+      }
+    }
+
+    if (agentsWithActivities.length > 0 && fileActivities.length > 0) {
+      // Convert file activities to database activity format
+      const convertedActivities = fileActivities.map((act: any) => ({
+        id: act.id || `file-${Date.now()}-${Math.random()}`,
+        agentId: agentsWithActivities[0].id,
+        timestamp: new Date(act.timestamp).getTime(),
+        action: act.type, // 'tool_call', 'thought', 'tool_result'
+        description: act.type === 'tool_call' ? `Calling tool: ${act.tool}` : 
+                    act.type === 'thought' ? act.content :
+                    act.type === 'tool_result' ? 'Tool output received' : act.type,
+        metadata: act
+      }))
+      
+      // Append and sort
+      agentsWithActivities[0].activities = [
+        ...agentsWithActivities[0].activities,
+        ...convertedActivities
+      ].sort((a, b) => a.timestamp - b.timestamp)
+    }
 
     return NextResponse.json({
       research,
@@ -38,6 +38,7 @@ export const PROGRESS_LIMITS = {
   RESULT_MAX_LENGTH: 500,
   READ_FILE_MAX_LENGTH: 2000,
   ACTIVITY_MAX_COUNT: 1000,
+  ACTIVITY_COMPACT_INTERVAL: 100, // Lines .activities.jsonl may exceed the cap by before a trim
   MAX_CONSECUTIVE_ERRORS: 5,
   COMPLETION_THRESHOLD: 90,  // Percentage at which to check for missing files
   BLOCKED_PERCENTAGE: 85,    // Cap percentage when blocked by missing files
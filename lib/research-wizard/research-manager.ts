@@ -320,7 +320,7 @@ export class ResearchManager {
             line.match(/^\s*[{}\[\],]\s*$/) || // Just brackets/braces
             line.includes('"max_releases"') ||
             line.includes('"default":') ||
-            (line.includes('"type":') && !line.includes('"type": "tool_result"') && !line.includes('"type": "tool_use"'))
+            (line.includes('"type":') && !/"type":\s*"tool_(result|use)"/.test(line))
           
           if (isToolSchemaNoise) {
             continue
@@ -100,9 +100,7 @@ export function isToolSchemaNoise(line: string): boolean {
     /^\s*[{}\[\],]\s*$/.test(line) ||
     line.includes('"max_releases"') ||
     line.includes('"default":') ||
-    (line.includes('"type":') && 
-     !line.includes('"type": "tool_result"') && 
-     !line.includes('"type": "tool_use"'))
+    (line.includes('"type":') && !/"type":\s*"tool_(result|use)"/.test(line))
   )
 }
 
@@ -7,7 +7,11 @@ Provides safe read/write operations for research project directories.
 Refactored to follow DRY principle - HTML validation shared with research-agent.py
 """
 
+import mmap
+import os
+import stat
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 from mcp.server.fastmcp import FastMCP
@@ -18,9 +22,48 @@ sys.path.insert(0, str(scripts_dir))
 from utils.html_validator import (  # type: ignore
     extract_local_links_from_html,
     check_missing_files_in_project,
+    clear_missing_cache,
     format_missing_files_error,
     format_missing_files_warning,
 )
+from utils.json_io import loads as json_loads, write_json_atomic  # type: ignore
+
+# Files larger than this are decoded straight from a memory map in read_file
+_MMAP_READ_THRESHOLD = 256 * 1024
+
+# Minimum request size for each read once the fstat size has been consumed
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Flags for read_file's os.open(). O_NONBLOCK keeps opening a FIFO from
+# blocking before fstat can reject it (it doesn't affect regular files);
+# O_BINARY stops Windows from translating CRLF or stopping at Ctrl-Z.
+_READ_OPEN_FLAGS = (
+    os.O_RDONLY | getattr(os, "O_NONBLOCK", 0) | getattr(os, "O_BINARY", 0)
+)
+
+
+def _read_all(fd: int, size_hint: int) -> bytes:
+    """
+    Read a freshly opened file descriptor from offset 0 to EOF.
+
+    size_hint (normally st_size from fstat) only sizes the first read: a
+    single read may return fewer bytes, and the file may grow meanwhile.
+    Uses os.pread where available and falls back to os.read (e.g. Windows).
+    """
+    chunks = []
+    offset = 0
+    while True:
+        want = max(size_hint - offset, _READ_CHUNK_SIZE)
+        if hasattr(os, "pread"):
+            chunk = os.pread(fd, want, offset)
+        else:
+            chunk = os.read(fd, want)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        offset += len(chunk)
+    return b"".join(chunks)
+
 
 # Initialize FastMCP server
 mcp = FastMCP("filesystem")
@@ -28,34 +71,96 @@ mcp = FastMCP("filesystem")
 # Safety: Only allow operations in specific directories
 ALLOWED_BASE_DIRS: list[Path] = []
 
+# Resolved allowed directories as plain strings, precomputed so containment
+# is a set lookup plus a single str.startswith over all bases
+_ALLOWED_EXACT: frozenset[str] = frozenset()
+_ALLOWED_PREFIXES: tuple[str, ...] = ()
+
+# Resolved and as-configured allowed directories with a trailing separator,
+# used to reject absolute paths lexically before any syscall
+_LEXICAL_PREFIXES: tuple[str, ...] = ()
+
+# Last progress state this server wrote, reused while the file on disk is
+# unchanged (same inode/mtime/size) so updates skip re-reading and re-parsing
+# it. Every atomic replace creates a new inode, so the inode tells our write
+# apart from the research agent's even when the mtime resolution is coarse.
+_PROGRESS_STATE: dict[str, Any] | None = None
+
 
 def set_allowed_directories(directories: list[str]) -> None:
     """Configure which directories this server can access."""
-    global ALLOWED_BASE_DIRS
+    global ALLOWED_BASE_DIRS, _ALLOWED_EXACT, _ALLOWED_PREFIXES, _PROGRESS_STATE
+    global _LEXICAL_PREFIXES
     ALLOWED_BASE_DIRS = [Path(d).resolve() for d in directories]
+    _ALLOWED_EXACT = frozenset(str(base) for base in ALLOWED_BASE_DIRS)
+    _ALLOWED_PREFIXES = tuple(
+        str(base).rstrip(os.sep) + os.sep for base in ALLOWED_BASE_DIRS
+    )
+    _LEXICAL_PREFIXES = tuple(
+        dict.fromkeys(
+            _ALLOWED_PREFIXES
+            + tuple(os.path.abspath(d).rstrip(os.sep) + os.sep for d in directories)
+        )
+    )
+    _PROGRESS_STATE = None
 
 
-def is_path_allowed(path: Path) -> tuple[bool, Path]:
-    """Check if a path is within allowed directories.
+def _resolve_path(path_str: str) -> tuple[bool, str]:
+    """Resolve a raw path string and check it against the allowed directories.
+
+    Symlinks are resolved on every call and never cached: a link swapped in
+    after an earlier check must not inherit that check's result.
+
+    Returns:
+        Tuple of (is_allowed, resolved_path_str)
+    """
+    # If path is relative, resolve it against the first allowed directory
+    if not os.path.isabs(path_str) and ALLOWED_BASE_DIRS:
+        path_str = os.path.join(ALLOWED_BASE_DIRS[0], path_str)
+
+    resolved = os.path.realpath(path_str)
+    is_allowed = resolved in _ALLOWED_EXACT or resolved.startswith(_ALLOWED_PREFIXES)
+    return (is_allowed, resolved)
+
+
+def _resolve_allowed(path: str) -> tuple[bool, str]:
+    """String-only variant of is_path_allowed() used by the tools.
 
     Returns:
-        Tuple of (is_allowed, resolved_path)
+        Tuple of (is_allowed, resolved_path_str)
     """
+    # Fast reject: an absolute path that isn't even lexically inside an
+    # allowed directory is denied without resolving symlinks
+    if os.path.isabs(path) and not (path + os.sep).startswith(_LEXICAL_PREFIXES):
+        return (False, path)
+
     try:
-        # If path is relative, resolve it against the first allowed directory
-        if not path.is_absolute() and ALLOWED_BASE_DIRS:
-            path = ALLOWED_BASE_DIRS[0] / path
-
-        resolved_path = path.resolve()
-        is_allowed = any(
-            resolved_path == base or base in resolved_path.parents
-            for base in ALLOWED_BASE_DIRS
-        )
-        return (is_allowed, resolved_path)
+        return _resolve_path(path)
     except (OSError, ValueError):
         return (False, path)
 
 
+def is_path_allowed(path: Path) -> tuple[bool, Path]:
+    """Check if a path is within allowed directories.
+
+    Returns:
+        Tuple of (is_allowed, resolved_path); the input path is returned
+        unchanged when it is not allowed
+    """
+    is_allowed, resolved = _resolve_allowed(str(path))
+    if not is_allowed:
+        return (False, path)
+    return (True, Path(resolved))
+
+
+def _stat_or_none(path: str) -> os.stat_result | None:
+    """Stat a path once, returning None if it doesn't exist."""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
 @mcp.tool()
 def read_file(path: str) -> str:
     """
@@ -72,18 +177,47 @@ def read_file(path: str) -> str:
         FileNotFoundError: If file doesn't exist
         PermissionError: If file can't be read
     """
-    is_allowed, file_path = is_path_allowed(Path(path))
+    is_allowed, file_path = _resolve_allowed(path)
 
     if not is_allowed:
         raise ValueError(f"Path '{path}' is outside allowed directories")
 
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {path}")
-
-    if not file_path.is_file():
-        raise ValueError(f"Path is not a file: {path}")
+    try:
+        fd = os.open(file_path, _READ_OPEN_FLAGS)
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(f"File not found: {path}") from None
 
-    return file_path.read_text(encoding="utf-8")
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode):
+            raise ValueError(f"Path is not a file: {path}")
+
+        text = None
+        if st.st_size > _MMAP_READ_THRESHOLD:
+            # Large file: decode directly from the mapping, skipping the
+            # intermediate bytes copy. Mapping fails if the file was
+            # truncated to zero length meanwhile; read it normally then.
+            try:
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    text = str(mm, "utf-8")
+            except UnicodeDecodeError:
+                raise
+            except (ValueError, OSError):
+                pass
+        if text is None:
+            # Small file (or mmap unavailable): read sized from fstat, then
+            # decode once
+            text = _read_all(fd, st.st_size).decode("utf-8")
+    finally:
+        os.close(fd)
+
+    # Match read_text()'s universal newline handling
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    return text
 
 
 @mcp.tool()
@@ -102,16 +236,20 @@ def write_file(path: str, content: str) -> str:
         ValueError: If path is outside allowed directories
         PermissionError: If file can't be written
     """
-    is_allowed, file_path = is_path_allowed(Path(path))
+    is_allowed, file_path = _resolve_allowed(path)
 
     if not is_allowed:
         raise ValueError(f"Path '{path}' is outside allowed directories")
 
     # Create parent directories if they don't exist
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
 
     # Write the file
-    file_path.write_text(content, encoding="utf-8")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+    # The new file may satisfy a link previously reported as missing
+    clear_missing_cache()
 
     return f"Successfully wrote {len(content)} characters to {file_path}"
 
@@ -132,21 +270,25 @@ def list_directory(path: str) -> str:
         FileNotFoundError: If directory doesn't exist
         NotADirectoryError: If path is not a directory
     """
-    is_allowed, dir_path = is_path_allowed(Path(path))
+    is_allowed, dir_path = _resolve_allowed(path)
 
     if not is_allowed:
         raise ValueError(f"Path '{path}' is outside allowed directories")
 
-    if not dir_path.exists():
+    st = _stat_or_none(dir_path)
+
+    if st is None:
         raise FileNotFoundError(f"Directory not found: {path}")
 
-    if not dir_path.is_dir():
+    if not stat.S_ISDIR(st.st_mode):
         raise NotADirectoryError(f"Path is not a directory: {path}")
 
-    items = []
-    for item in sorted(dir_path.iterdir()):
-        item_type = "DIR " if item.is_dir() else "FILE"
-        items.append(f"{item_type} {item.name}")
+    # DirEntry.is_dir() uses the type from readdir, avoiding a stat per entry
+    with os.scandir(dir_path) as it:
+        items = [
+            f"{'DIR ' if entry.is_dir() else 'FILE'} {entry.name}"
+            for entry in sorted(it, key=lambda e: e.name)
+        ]
 
     if not items:
         return f"Directory is empty: {path}"
@@ -169,15 +311,18 @@ def create_directory(path: str) -> str:
         ValueError: If path is outside allowed directories
         FileExistsError: If a file already exists at this path
     """
-    is_allowed, dir_path = is_path_allowed(Path(path))
+    is_allowed, dir_path = _resolve_allowed(path)
 
     if not is_allowed:
         raise ValueError(f"Path '{path}' is outside allowed directories")
 
-    if dir_path.exists() and dir_path.is_file():
+    st = _stat_or_none(dir_path)
+
+    if st is not None and stat.S_ISREG(st.st_mode):
         raise FileExistsError(f"A file already exists at: {path}")
 
-    dir_path.mkdir(parents=True, exist_ok=True)
+    os.makedirs(dir_path, exist_ok=True)
+    clear_missing_cache()
 
     return f"Successfully created directory: {dir_path}"
 
@@ -196,12 +341,13 @@ def file_exists(path: str) -> bool:
     Raises:
         ValueError: If path is outside allowed directories
     """
-    is_allowed, file_path = is_path_allowed(Path(path))
+    is_allowed, file_path = _resolve_allowed(path)
 
     if not is_allowed:
         raise ValueError(f"Path '{path}' is outside allowed directories")
 
-    return file_path.exists()
+    # Existence only - no stat fields needed
+    return os.access(file_path, os.F_OK)
 
 
 @mcp.tool()
@@ -219,24 +365,25 @@ def get_file_info(path: str) -> dict[str, Any]:
         ValueError: If path is outside allowed directories
         FileNotFoundError: If path doesn't exist
     """
-    is_allowed, file_path = is_path_allowed(Path(path))
+    is_allowed, file_path = _resolve_allowed(path)
 
     if not is_allowed:
         raise ValueError(f"Path '{path}' is outside allowed directories")
 
-    if not file_path.exists():
-        raise FileNotFoundError(f"Path not found: {path}")
+    st = _stat_or_none(file_path)
 
-    stat = file_path.stat()
+    if st is None:
+        raise FileNotFoundError(f"Path not found: {path}")
 
+    # file_path is already resolved by _resolve_allowed
     return {
-        "path": str(file_path),
-        "name": file_path.name,
-        "type": "directory" if file_path.is_dir() else "file",
-        "size": stat.st_size,
-        "created": stat.st_ctime,
-        "modified": stat.st_mtime,
-        "absolute_path": str(file_path.resolve()),
+        "path": file_path,
+        "name": os.path.basename(file_path),
+        "type": "directory" if stat.S_ISDIR(st.st_mode) else "file",
+        "size": st.st_size,
+        "created": st.st_ctime,
+        "modified": st.st_mtime,
+        "absolute_path": file_path,
     }
 
 
@@ -273,14 +420,12 @@ def write_research_metadata(
             summary="Reviewed 15+ indoor grill models focusing on smoke reduction and ease of use"
         )
     """
-    import json
-    from datetime import datetime
-
     if not ALLOWED_BASE_DIRS:
         return "Warning: No research directory configured, metadata not saved"
 
     # Metadata file is always in the first allowed directory
     metadata_file = ALLOWED_BASE_DIRS[0] / "metadata.json"
+    now_iso = datetime.utcnow().isoformat() + "Z"
 
     metadata = {
         "title": title,
@@ -288,11 +433,11 @@ def write_research_metadata(
         "category": category,
         "tags": tags or [],
         "summary": summary,
-        "createdAt": datetime.utcnow().isoformat() + "Z",
-        "updatedAt": datetime.utcnow().isoformat() + "Z",
+        "createdAt": now_iso,
+        "updatedAt": now_iso,
     }
 
-    metadata_file.write_text(json.dumps(metadata, indent=2))
+    write_json_atomic(metadata_file, metadata)
 
     return f"✅ Metadata saved successfully!\n\nTitle: {title}\nCategory: {category}\nTags: {', '.join(tags or [])}\n\nThis project will now display as '{title}' in the research portal."
 
@@ -337,8 +482,7 @@ def update_research_progress(
     local links point to files that don't exist yet. Make sure to create all
     files you reference before marking progress as 100% complete!
     """
-    import json
-    from datetime import datetime, timedelta
+    global _PROGRESS_STATE
 
     if not ALLOWED_BASE_DIRS:
         return "Warning: No research directory configured, progress not saved"
@@ -348,22 +492,32 @@ def update_research_progress(
     # Progress file is always in the first allowed directory
     progress_file = project_dir / ".research-progress.json"
 
-    # Read existing progress to preserve completed tasks list and startedAt
+    # Preserve completed tasks list and startedAt from the existing progress.
+    # The research agent writes this file too, so only trust our in-memory
+    # copy while the file is exactly as we last left it.
     completed_tasks = []
     started_at = None
-    if progress_file.exists():
-        try:
-            existing = json.loads(progress_file.read_text())
-            completed_tasks = existing.get("completedTasks", [])
-            started_at = existing.get("startedAt")
-        except:
-            pass
+    st = _stat_or_none(str(progress_file))
+    if st is not None:
+        cached = _PROGRESS_STATE
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if cached is not None and cached["stat"] == key:
+            completed_tasks = list(cached["completedTasks"])
+            started_at = cached["startedAt"]
+        else:
+            try:
+                existing = json_loads(progress_file.read_bytes())
+                completed_tasks = existing.get("completedTasks", [])
+                started_at = existing.get("startedAt")
+            except Exception:
+                pass
 
     # Add current task to completed list if we're progressing
     if percentage > 0 and current_task not in completed_tasks and percentage < 100:
         completed_tasks.append(current_task)
 
     now = datetime.utcnow()
+    now_iso = now.isoformat() + "Z"
 
     # Calculate estimated completion time
     estimated_completion = None
@@ -377,8 +531,8 @@ def update_research_progress(
         "currentTask": current_task,
         "currentTaskDescription": task_description,
         "completedTasks": completed_tasks,
-        "startedAt": started_at or now.isoformat() + "Z",
-        "updatedAt": now.isoformat() + "Z",
+        "startedAt": started_at or now_iso,
+        "updatedAt": now_iso,
         "estimatedMinutesRemaining": estimated_minutes_remaining,
         "estimatedCompletion": estimated_completion,
     }
@@ -396,7 +550,13 @@ def update_research_progress(
             f"Cannot complete - {total_missing} referenced files not created yet"
         )
 
-    progress_file.write_text(json.dumps(progress, indent=2))
+    write_json_atomic(progress_file, progress)
+    st = os.stat(progress_file)
+    _PROGRESS_STATE = {
+        "stat": (st.st_ino, st.st_mtime_ns, st.st_size),
+        "completedTasks": list(progress["completedTasks"]),
+        "startedAt": progress["startedAt"],
+    }
 
     time_str = (
         f" (~{estimated_minutes_remaining} min remaining)"
@@ -455,8 +615,6 @@ def update_research_progress(
 
 def main():
     """Run the MCP server."""
-    import sys
-    import json
 
     # Read allowed directories from environment or command line
     if len(sys.argv) > 1:
@@ -467,10 +625,10 @@ def main():
         try:
             config_line = sys.stdin.readline()
             if config_line.strip():
-                config = json.loads(config_line)
+                config = json_loads(config_line)
                 if "allowed_directories" in config:
                     set_allowed_directories(config["allowed_directories"])
-        except (json.JSONDecodeError, KeyError):
+        except (ValueError, KeyError):
             pass
 
     if not ALLOWED_BASE_DIRS:
@@ -480,8 +638,20 @@ def main():
             "No allowed directories configured. Server will reject all operations."
         )
 
+    # Every tool call is a JSON-RPC round trip over stdin/stdout, so the
+    # server spends most of its time in the event loop's pipe I/O and
+    # callback dispatch, which uvloop does with less overhead. uvloop.run()
+    # is used instead of the deprecated uvloop.install() (Python 3.12+).
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
     # Run the FastMCP server
-    mcp.run()
+    if uvloop is not None:
+        uvloop.run(mcp.run_stdio_async())
+    else:
+        mcp.run()
 
 
 if __name__ == "__main__":
@@ -6,33 +6,176 @@ Executes research tasks with MCP tools and multiple LLM providers
 Refactored to follow DRY principle - HTML validation shared with filesystem-server.py
 """
 
+import ast
 import asyncio
-import json
+import atexit
+import copy
+import functools
 import sys
 import logging
+import queue
+import time
 import re
+import threading
+from collections import deque
 from typing import cast, Any
 from datetime import datetime
 from pathlib import Path
 from io import StringIO
 
+import yaml
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    from watchfiles import awatch
+except ImportError:  # Optional: message_loop falls back to polling
+    awatch = None
+
 from mcp_agent.app import MCPApp
 from mcp_agent.agents.agent import Agent
 from mcp_agent.config import Settings, LoggerSettings
+from mcp_agent.workflows.llm.augmented_llm import RequestParams
 
 # Import shared utilities (DRY principle)
 from utils.html_validator import check_missing_files_in_project  # type: ignore
+from utils.json_io import (  # type: ignore
+    dumps as json_dumps,
+    loads as json_loads,
+    write_atomic,
+    write_json_atomic,
+)
 from utils.constants import (  # type: ignore
-    DEPTH_INSTRUCTIONS,
-    STYLE_INSTRUCTIONS,
-    DEFAULT_MODELS,
     PROGRESS_LIMITS,
-    get_default_model,
     get_depth_instruction,
     get_style_instruction,
 )
 
 
+# LLM request parameters shared by the initial research and follow-up messages
+_REQUEST_PARAMS = RequestParams(
+    max_iterations=999999,
+    temperature=0.7,
+    maxTokens=16384,
+)
+
+# ToolCallHandler patterns, compiled once since emit() runs for every log record
+_TOOL_NAME_RE = re.compile(r'"tool_name":\s*"([a-zA-Z0-9_.-]+)"')
+_NAME_RE = re.compile(r'"name":\s*"([a-zA-Z0-9_.-]+)"')
+_ACTION_LINE_RE = re.compile(r"^Action:\s+([a-zA-Z0-9_]+)", re.MULTILINE)
+_ACTION_RE = re.compile(r"Action:\s+([a-zA-Z0-9_]+)")
+# Matches up to the opening brace of the args; the args run to the last "}" in
+# the message. Slicing instead of a trailing ({.+}) keeps matching linear on
+# long messages full of unterminated braces.
+_TOOL_CALL_RE = re.compile(
+    r"(?:Calling|Executing|Invoking|Requesting)\s+(?:tool|function)[:\s]+['\"]?([a-zA-Z0-9_.-]+)['\"]?\s+with\s+(?:args|arguments|parameters)[:\s]*(?={)",
+    re.IGNORECASE,
+)
+_TOOL_CALL_SIMPLE_RE = re.compile(
+    r"(?:Calling|Executing|Invoking|Requesting)\s+(?:tool|function)[:\s]+['\"]?([a-zA-Z0-9_.-]+)['\"]?",
+    re.IGNORECASE,
+)
+
+# Literal markers the emit() branches look for. Records that contain none of
+# them (most DEBUG traffic) are dropped with plain substring checks.
+_MARKERS = (
+    '"tool_name"',
+    '"name"',
+    "Action:",
+    "Thought:",
+    "Reasoning:",
+    "Plan:",
+    "Tool call results:",
+)
+# Verbs the tool-call patterns match case-insensitively
+_CALL_VERB_RE = re.compile("calling|executing|invoking|requesting", re.IGNORECASE)
+
+# Words the simple tool-call pattern picks up that are not tool names
+_TOOL_NAME_BLOCKLIST = frozenset(
+    ["to", "call", "be", "the", "a", "an", "with", "for", "jsonrpc", "mcp_agent"]
+)
+
+# "[Calling tool xxx with args {...}]" markers in generate_str() responses
+_RESPONSE_TOOL_CALL_RE = re.compile(
+    r"\[Calling tool ([a-zA-Z0-9_.-]+) with args (\{[^}]+\})\]"
+)
+_RESPONSE_TOOL_MARKER_RE = re.compile(r"\[Calling tool [^\]]+\]")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+
+
+# (second, "YYYY-MM-DDTHH:MM:SS") of the last formatted timestamp
+_timestamp_prefix: tuple[int, str] = (-1, "")
+
+
+def utc_timestamp() -> str:
+    """Current UTC time formatted like datetime.utcnow().isoformat()"""
+    global _timestamp_prefix
+    now = time.time()
+    second = int(now)
+    if second != _timestamp_prefix[0]:
+        # Only re-run strftime once per second; events arrive in bursts
+        _timestamp_prefix = (
+            second,
+            time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)),
+        )
+    return f"{_timestamp_prefix[1]}.{int((now - second) * 1_000_000):06d}"
+
+
+class ProtocolEmitter:
+    """Buffers JSON protocol messages and writes each burst to STDOUT at once"""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+
+    def emit(self, event: dict):
+        payload = json_dumps(event, newline=True)
+        with self._lock:
+            self._buf += payload
+            if self._flush_scheduled:
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                # Flush once the current event-loop step finishes, so events
+                # emitted back to back share one write
+                self._flush_scheduled = True
+                loop.call_soon(self.flush)
+                return
+        # No event loop in this thread: write immediately
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush_scheduled = False
+            if not self._buf:
+                return
+            buf, self._buf = self._buf, bytearray()
+            # orjson already returns UTF-8 bytes, so skip the text layer entirely
+            sys.stdout.buffer.write(buf)
+            sys.stdout.buffer.flush()
+
+
+_protocol = ProtocolEmitter()
+atexit.register(_protocol.flush)
+
+
+def emit_event(event: dict):
+    """Queue one JSON protocol message for STDOUT (for ResearchManager)"""
+    _protocol.emit(event)
+
+
+def flush_events():
+    """Write queued protocol messages now, e.g. before a long LLM call"""
+    _protocol.flush()
+
+
 def infer_tool_from_output(output: str) -> str:
     """Infer the tool name from the output content"""
     output_lower = output.lower()
@@ -51,35 +194,123 @@ def infer_tool_from_output(output: str) -> str:
     return "Unknown Tool"
 
 
-def write_activity_to_file(project_dir: str, activity: dict):
-    """Write activity to .activities.json file for persistence"""
+@functools.lru_cache(maxsize=None)
+def load_prompt(name: str) -> str:
+    """Read a prompt template relative to scripts/ (static, so read once)"""
+    return (Path(__file__).parent / name).read_text()
+
+
+def parse_tool_results(payload: str):
+    """Parse a logged tool results list, trying JSON before a Python repr"""
     try:
-        activities_file = Path(project_dir) / ".activities.json"
-        activities = []
+        return json_loads(payload)
+    except ValueError:
+        return ast.literal_eval(payload)
+
+
+@functools.lru_cache(maxsize=32)
+def _project_paths(project_dir: str) -> tuple[Path, Path, Path, Path]:
+    """Paths of a project's (activities, messages, progress, kill) files"""
+    p = Path(project_dir)
+    return (
+        p / ".activities.jsonl",
+        p / ".messages.json",
+        p / ".research-progress.json",
+        p / ".kill",
+    )
 
-        # Load existing activities
-        if activities_file.exists():
-            try:
-                activities = json.loads(activities_file.read_text())
-            except:
-                activities = []
 
-        # Add new activity with unique ID
-        activity["id"] = (
-            f"activity_{int(datetime.now().timestamp() * 1000)}_{activity['type']}"
+class ActivityLog:
+    """Append-only .activities.jsonl writer, trimmed to the newest activities"""
+
+    def __init__(self, project_dir: str):
+        self.path = _project_paths(project_dir)[0]
+        try:
+            with self.path.open("rb") as f:
+                self._lines = sum(1 for _ in f)
+        except FileNotFoundError:
+            self._lines = 0
+        self._file = self.path.open("ab")
+
+    def append(self, activity: dict):
+        self._file.write(json_dumps(activity, newline=True))
+        self._lines += 1
+        # Let the log overshoot the cap by one interval so trims are amortized
+        if self._lines > (
+            PROGRESS_LIMITS["ACTIVITY_MAX_COUNT"]
+            + PROGRESS_LIMITS["ACTIVITY_COMPACT_INTERVAL"]
+        ):
+            self.compact()
+
+    def flush(self):
+        self._file.flush()
+
+    def compact(self):
+        """Rewrite the log keeping only the last ACTIVITY_MAX_COUNT lines"""
+        self._file.close()
+        with self.path.open("rb") as f:
+            lines = deque(f, maxlen=PROGRESS_LIMITS["ACTIVITY_MAX_COUNT"])
+        write_atomic(self.path, b"".join(lines))
+        self._file = self.path.open("ab")
+        self._lines = len(lines)
+
+
+# Open activity logs, keyed by project directory (used by the writer thread)
+_activity_logs: dict[str, ActivityLog] = {}
+
+# (function, args) file writes waiting for the writer thread; None stops it
+_write_queue: queue.SimpleQueue = queue.SimpleQueue()
+_writer: threading.Thread | None = None
+
+
+def _run_queued_writes():
+    """Writer thread: run queued file writes in order, off the event loop thread"""
+    while True:
+        item = _write_queue.get()
+        if item is not None:
+            func, args = item
+            try:
+                func(*args)
+            except Exception as e:
+                # Don't crash if file write fails
+                # Write error to stderr so it doesn't break JSON parsing
+                sys.stderr.write(f"File write failed in {func.__name__}: {str(e)}\n")
+            if not _write_queue.empty():
+                continue  # Keep buffering activities while a burst lasts
+
+        # Queue drained: make buffered activities visible to the web app
+        for log in _activity_logs.values():
+            try:
+                log.flush()
+            except OSError as e:
+                sys.stderr.write(f"Failed to write activity file: {str(e)}\n")
+        if item is None:
+            return
+
+
+def write_in_background(func, *args):
+    """Queue func(*args) for the writer thread, starting it on first use"""
+    global _writer
+    if _writer is None:
+        _writer = threading.Thread(
+            target=_run_queued_writes, name="file-writer", daemon=True
         )
-        activities.append(activity)
+        _writer.start()
+    _write_queue.put((func, args))
 
-        # Keep only last 1000 activities to prevent file bloat
-        if len(activities) > 1000:
-            activities = activities[-1000:]
 
-        # Write back
-        activities_file.write_text(json.dumps(activities, indent=2))
-    except Exception as e:
-        # Don't crash if file write fails
-        # Write error to stderr so it doesn't break JSON parsing
-        sys.stderr.write(f"Failed to write activity file: {str(e)}\n")
+def _append_activity(project_dir: str, activity: dict):
+    log = _activity_logs.get(project_dir)
+    if log is None:
+        log = _activity_logs[project_dir] = ActivityLog(project_dir)
+    log.append(activity)
+
+
+def write_activity_to_file(project_dir: str, activity: dict):
+    """Queue activity for appending to the .activities.jsonl file"""
+    # Add new activity with unique ID
+    activity["id"] = f"activity_{int(time.time() * 1000)}_{activity['type']}"
+    write_in_background(_append_activity, project_dir, activity)
 
 
 class ToolCallHandler(logging.Handler):
@@ -98,6 +329,12 @@ class ToolCallHandler(logging.Handler):
             if "idempotency_key" in msg or "api_key" in msg:
                 return
 
+            # Fast reject before the branch regexes: the case-sensitive
+            # marker checks first, the verb search only if none is present
+            has_marker = any(marker in msg for marker in _MARKERS)
+            if not has_marker and not _CALL_VERB_RE.search(msg):
+                return
+
             # NEW Pattern: mcp-agent streaming format - "Requesting tool call" followed by tool_name
             # This catches: [INFO] mcp_agent: [...] Requesting tool call
             if "Requesting tool call" in msg:
@@ -106,7 +343,9 @@ class ToolCallHandler(logging.Handler):
 
             # NEW Pattern: Capture "tool_name": "xxx" from streaming output
             # This catches lines like: "tool_name": "web_search",
-            tool_name_match = re.search(r'"tool_name":\s*"([a-zA-Z0-9_.-]+)"', msg)
+            tool_name_match = (
+                _TOOL_NAME_RE.search(msg) if '"tool_name"' in msg else None
+            )
             if tool_name_match:
                 tool_name = tool_name_match.group(1)
                 ToolCallHandler.last_tool_called = tool_name
@@ -116,18 +355,20 @@ class ToolCallHandler(logging.Handler):
                     "type": "tool_call",
                     "tool": tool_name,
                     "args": "(streaming - args in separate message)",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": utc_timestamp(),
                 }
                 # PRINT TO STDOUT (for ResearchManager)
-                print(json.dumps(activity) + "\n", flush=True, end="")
+                emit_event(activity)
                 if ToolCallHandler.project_dir:
                     write_activity_to_file(ToolCallHandler.project_dir, activity)
                 return
 
             # NEW Pattern: Capture tool name from "name": "xxx" in tools/call messages
             # This catches lines like: "name": "crawl_url",
-            if ToolCallHandler.pending_tool_call or '"method": "tools/call"' in msg:
-                name_match = re.search(r'"name":\s*"([a-zA-Z0-9_.-]+)"', msg)
+            if '"name"' in msg and (
+                ToolCallHandler.pending_tool_call or '"method": "tools/call"' in msg
+            ):
+                name_match = _NAME_RE.search(msg)
                 if name_match:
                     tool_name = name_match.group(1)
                     # Skip if it's just the method name
@@ -139,9 +380,9 @@ class ToolCallHandler(logging.Handler):
                             "type": "tool_call",
                             "tool": tool_name,
                             "args": "(streaming)",
-                            "timestamp": datetime.utcnow().isoformat(),
+                            "timestamp": utc_timestamp(),
                         }
-                        print(json.dumps(activity) + "\n", flush=True, end="")
+                        emit_event(activity)
                         if ToolCallHandler.project_dir:
                             write_activity_to_file(
                                 ToolCallHandler.project_dir, activity
@@ -150,7 +391,7 @@ class ToolCallHandler(logging.Handler):
 
             # Pattern 1: Tool Execution
             # Try matching "Action: tool_name" format first
-            action_match = re.search(r"^Action:\s+([a-zA-Z0-9_]+)", msg, re.MULTILINE)
+            action_match = _ACTION_LINE_RE.search(msg) if "Action:" in msg else None
             if action_match:
                 tool_name = action_match.group(1)
                 ToolCallHandler.last_tool_called = tool_name
@@ -159,29 +400,30 @@ class ToolCallHandler(logging.Handler):
                     "type": "tool_call",
                     "tool": tool_name,
                     "args": "Action format (args not extracted)",
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": utc_timestamp(),
                 }
                 # PRINT TO STDOUT (for ResearchManager)
-                print(json.dumps(activity) + "\n", flush=True, end="")
+                emit_event(activity)
                 if ToolCallHandler.project_dir:
                     write_activity_to_file(ToolCallHandler.project_dir, activity)
                 return
 
+            # Records let through by a marker have not been searched for
+            # a call verb yet; without one neither tool-call pattern matches
+            has_call = not has_marker or _CALL_VERB_RE.search(msg) is not None
+
             # First try structured tool call format
-            tool_match = re.search(
-                r"(?:Calling|Executing|Invoking|Requesting)\s+(?:tool|function)[:\s]+['\"]?([a-zA-Z0-9_.-]+)['\"]?\s+with\s+(?:args|arguments|parameters)[:\s]*({.+})",
-                msg,
-                re.IGNORECASE | re.DOTALL,
-            )
+            tool_match = _TOOL_CALL_RE.search(msg) if has_call else None
+            args_end = msg.rfind("}") + 1 if tool_match else 0
 
-            if tool_match:
+            if tool_match and args_end > tool_match.end() + 2:
                 tool_name = tool_match.group(1)
-                tool_args_str = tool_match.group(2).strip()
+                tool_args_str = msg[tool_match.end() : args_end]
 
                 # Try to parse as JSON for better formatting
                 try:
-                    tool_args = json.loads(tool_args_str)
-                except:
+                    tool_args = json_loads(tool_args_str)
+                except ValueError:
                     tool_args = tool_args_str
 
                 # Store the tool name for the next result
@@ -191,71 +433,46 @@ class ToolCallHandler(logging.Handler):
                     "type": "tool_call",
                     "tool": tool_name,
                     "args": tool_args,
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": utc_timestamp(),
                 }
                 # PRINT TO STDOUT
-                print(json.dumps(activity) + "\n", flush=True, end="")
+                emit_event(activity)
                 if ToolCallHandler.project_dir:
                     write_activity_to_file(ToolCallHandler.project_dir, activity)
                 return
 
             # Fallback: Try simpler pattern without args
-            tool_match_simple = re.search(
-                r"(?:Calling|Executing|Invoking|Requesting)\s+(?:tool|function)[:\s]+['\"]?([a-zA-Z0-9_.-]+)['\"]?",
-                msg,
-                re.IGNORECASE,
-            )
+            tool_match_simple = _TOOL_CALL_SIMPLE_RE.search(msg) if has_call else None
 
             if tool_match_simple:
                 candidate = tool_match_simple.group(1)
                 # Block list for false positives
-                if candidate.lower() not in [
-                    "to",
-                    "call",
-                    "be",
-                    "the",
-                    "a",
-                    "an",
-                    "with",
-                    "for",
-                    "jsonrpc",
-                    "mcp_agent",
-                ]:
+                if candidate.lower() not in _TOOL_NAME_BLOCKLIST:
                     tool_name = candidate
                     remaining = msg[tool_match_simple.end() :].strip()
                     ToolCallHandler.last_tool_called = tool_name
 
                     # PRINT TO STDOUT
-                    print(
-                        json.dumps(
-                            {
-                                "type": "tool_call",
-                                "tool": tool_name,
-                                "args": remaining
-                                if remaining
-                                else "No arguments provided",
-                                "timestamp": datetime.utcnow().isoformat(),
-                            }
-                        )
-                        + "\n",
-                        flush=True,
-                        end="",
+                    emit_event(
+                        {
+                            "type": "tool_call",
+                            "tool": tool_name,
+                            "args": remaining if remaining else "No arguments provided",
+                            "timestamp": utc_timestamp(),
+                        }
                     )
                     return
 
             # Pattern 2: Agent Thoughts/Reasoning
             if any(x in msg for x in ["Thought:", "Reasoning:", "Plan:", "Action:"]):
                 content = msg
-                for prefix in ["Thought:", "Reasoning:", "Plan:"]:
-                    if prefix in msg:
-                        parts = msg.split(prefix, 1)
-                        if len(parts) > 1:
-                            content = parts[1].strip()
-                            break
-
-                action_match = re.search(
-                    r"Action:\s+([a-zA-Z0-9_]+)", msg, re.MULTILINE
-                )
+                for prefix in ("Thought:", "Reasoning:", "Plan:"):
+                    index = msg.find(prefix)
+                    if index != -1:
+                        content = msg[index + len(prefix) :].strip()
+                        break
+
+                action_match = _ACTION_RE.search(msg)
                 if action_match:
                     tool_name = action_match.group(1)
                     ToolCallHandler.last_tool_called = tool_name
@@ -263,10 +480,10 @@ class ToolCallHandler(logging.Handler):
                 activity = {
                     "type": "thought",
                     "content": content,
-                    "timestamp": datetime.utcnow().isoformat(),
+                    "timestamp": utc_timestamp(),
                 }
                 # PRINT TO STDOUT
-                print(json.dumps(activity) + "\n", flush=True, end="")
+                emit_event(activity)
                 if ToolCallHandler.project_dir:
                     write_activity_to_file(ToolCallHandler.project_dir, activity)
                 return
@@ -274,12 +491,10 @@ class ToolCallHandler(logging.Handler):
             # Pattern 3: Tool Results
             if "Tool call results:" in msg:
                 content_to_show = ""
+                parts = msg.split("Tool call results: ", 1)
                 try:
-                    parts = msg.split("Tool call results: ", 1)
                     if len(parts) > 1:
-                        import ast
-
-                        results_list = ast.literal_eval(parts[1])
+                        results_list = parse_tool_results(parts[1])
                         cleaned_results = []
                         for result in results_list:
                             if "content" in result:
@@ -289,8 +504,8 @@ class ToolCallHandler(logging.Handler):
                         if cleaned_results:
                             content_to_show = "\n\n".join(cleaned_results)
                 except Exception:
-                    if len(msg.split("Tool call results: ", 1)) > 1:
-                        content_to_show = msg.split("Tool call results: ", 1)[1]
+                    if len(parts) > 1:
+                        content_to_show = parts[1]
                     else:
                         content_to_show = msg
 
@@ -303,10 +518,10 @@ class ToolCallHandler(logging.Handler):
                         "type": "tool_result",
                         "tool": tool_name,
                         "output": content_to_show,
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": utc_timestamp(),
                     }
                     # PRINT TO STDOUT
-                    print(json.dumps(activity) + "\n", flush=True, end="")
+                    emit_event(activity)
                     if ToolCallHandler.project_dir:
                         write_activity_to_file(ToolCallHandler.project_dir, activity)
                     return
@@ -315,10 +530,126 @@ class ToolCallHandler(logging.Handler):
             self.handleError(record)
 
 
+@functools.lru_cache(maxsize=4)
+def _parse_config(path: str, mtime_ns: int) -> dict:
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+def load_base_config(path: Path) -> dict:
+    """Load mcp_agent.config.yaml, re-parsing only when the file changes
+
+    Returns a deep copy, so callers can modify it freely.
+    """
+    return copy.deepcopy(_parse_config(str(path), path.stat().st_mtime_ns))
+
+
+_logging_configured = False
+
+
+def configure_logging():
+    """Route all logging through stderr and ToolCallHandler (once per process)
+
+    1. mcp-agent logs -> stderr (so they don't pollute stdout JSON stream)
+    2. ToolCallHandler -> stdout (JSON messages for ResearchManager)
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+
+    # Remove handlers from existing loggers so everything propagates to root.
+    # Placeholders have no handlers, so don't turn them into real loggers.
+    for logger in list(logging.root.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and (
+            logger.handlers or not logger.propagate
+        ):
+            logger.handlers = []
+            logger.propagate = True
+
+    # StreamHandler to stderr for all normal logs
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setFormatter(
+        logging.Formatter("[%(levelname)s] %(name)s: %(message)s")
+    )
+
+    # ToolCallHandler to stdout for structured JSON
+    tool_handler = ToolCallHandler()
+    tool_handler.setLevel(logging.DEBUG)
+
+    root_logger.handlers = [stderr_handler, tool_handler]
+
+    # SILENCE NOISY LOGGERS explicitly
+    noisy_loggers = [
+        "mcp_agent.workflows.llm.augmented_llm_anthropic",
+        "mcp_agent.workflows.llm.augmented_llm_openai",
+        "httpcore",
+        "httpx",
+    ]
+    for logger_name in noisy_loggers:
+        logging.getLogger(logger_name).setLevel(logging.INFO)
+
+
 # HTML validation functions now imported from utils.html_validator (DRY principle)
 # See scripts/utils/html_validator.py for implementation
 
 
+# Last progress written per project:
+# (state without timestamps, (inode, mtime_ns, size) of the file we wrote)
+_last_progress: dict[str, tuple[dict, tuple[int, int, int]]] = {}
+
+# Latest progress state per project that has not been written yet
+_pending_progress: dict[str, dict] = {}
+_progress_flush_scheduled = False
+
+
+def write_progress(project_dir: str, state: dict):
+    """Write a progress state to .research-progress.json unless it is unchanged"""
+    progress_file = _project_paths(project_dir)[2]
+
+    # Skip the write when nothing but the timestamps would change. The
+    # filesystem server writes this file too, so only trust the cached state
+    # while the file is exactly as we last left it. Each atomic replace gets
+    # a new inode, so a server write is noticed even within one mtime tick.
+    last = _last_progress.get(project_dir)
+    if last is not None and last[0] == state:
+        try:
+            st = progress_file.stat()
+            if (st.st_ino, st.st_mtime_ns, st.st_size) == last[1]:
+                return
+        except FileNotFoundError:
+            pass
+
+    now_iso = utc_timestamp() + "Z"
+    progress = {**state, "startedAt": now_iso, "estimatedCompletion": now_iso}
+    write_json_atomic(progress_file, progress)
+    st = progress_file.stat()
+    _last_progress[project_dir] = (state, (st.st_ino, st.st_mtime_ns, st.st_size))
+
+
+def flush_progress():
+    """Hand the latest pending progress state of every project to the writer"""
+    global _progress_flush_scheduled
+    _progress_flush_scheduled = False
+    for project_dir, state in _pending_progress.items():
+        write_in_background(write_progress, project_dir, state)
+    _pending_progress.clear()
+
+
+def _stop_writer():
+    """Write pending progress and let the writer thread drain before exit"""
+    flush_progress()
+    if _writer is not None:
+        _write_queue.put(None)
+        _writer.join(timeout=5)
+
+
+atexit.register(_stop_writer)
+
+
 async def update_progress(
     project_dir: str, percentage: int, current_task: str, completed_tasks: list[str]
 ):
@@ -327,8 +658,7 @@ async def update_progress(
     If percentage >= 90 and there are missing files referenced in HTML,
     progress is capped at 85% and a warning is logged.
     """
-    project_path = Path(project_dir)
-    progress_file = project_path / ".research-progress.json"
+    global _progress_flush_scheduled
 
     # Check for missing files if trying to complete
     actual_percentage = percentage
@@ -336,7 +666,10 @@ async def update_progress(
     task_description = f"Currently working on: {current_task}"
 
     if percentage >= PROGRESS_LIMITS["COMPLETION_THRESHOLD"]:
-        missing_files = check_missing_files_in_project(project_path)
+        # Scanning the project's HTML is file IO; keep it off the event loop
+        missing_files = await asyncio.to_thread(
+            check_missing_files_in_project, Path(project_dir)
+        )
         if missing_files:
             total_missing = sum(len(links) for links in missing_files.values())
             actual_percentage = PROGRESS_LIMITS["BLOCKED_PERCENTAGE"]
@@ -351,15 +684,19 @@ async def update_progress(
                 warning_msg += f"  {html_file}: {', '.join(links)}\n"
             sys.stderr.write(warning_msg)
 
-    progress = {
+    state = {
         "percentage": actual_percentage,
         "currentTask": actual_task,
         "currentTaskDescription": task_description,
-        "completedTasks": completed_tasks,
-        "startedAt": datetime.utcnow().isoformat() + "Z",
-        "estimatedCompletion": datetime.utcnow().isoformat() + "Z",
+        "completedTasks": list(completed_tasks),
     }
-    progress_file.write_text(json.dumps(progress, indent=2))
+
+    # Coalesce updates made within one event-loop step (e.g. 90% immediately
+    # followed by 100%): only the latest state per project gets written
+    _pending_progress[project_dir] = state
+    if not _progress_flush_scheduled:
+        _progress_flush_scheduled = True
+        asyncio.get_running_loop().call_soon(flush_progress)
 
 
 async def load_conversation_history(project_dir: str):
@@ -367,13 +704,13 @@ async def load_conversation_history(project_dir: str):
     Load previous conversation messages from .messages.json
     Returns a formatted conversation history string
     """
-    messages_file = Path(project_dir) / ".messages.json"
+    messages_file = _project_paths(project_dir)[1]
 
     if not messages_file.exists():
         return None
 
     try:
-        messages = json.loads(messages_file.read_text())
+        messages = json_loads(await asyncio.to_thread(messages_file.read_bytes))
         if not messages:
             return None
 
@@ -397,96 +734,100 @@ async def load_conversation_history(project_dir: str):
         return history
 
     except Exception as e:
-        print(
-            json.dumps(
-                {
-                    "type": "error",
-                    "error": f"Failed to load conversation history: {str(e)}",
-                }
-            )
-            + "\n",
-            flush=True,
-            end="",
+        emit_event(
+            {
+                "type": "error",
+                "error": f"Failed to load conversation history: {str(e)}",
+            }
         )
         return None
 
 
+# Poll interval for message_loop when watchfiles is unavailable or has failed
+_MESSAGE_POLL_SECONDS = 2
+# Pause before message_loop retries after an error
+_MESSAGE_ERROR_RETRY_SECONDS = 5
+
+
 async def message_loop(llm, project_dir: str):
     """
     Listen for new messages and continue the conversation
-    Polls for messages from the .messages.json file
+    Watches (or, without a working watchfiles watcher, polls) the .messages.json file
     """
-    messages_file = Path(project_dir) / ".messages.json"
+    _, messages_file, _, kill_file = _project_paths(project_dir)
+    project_path = messages_file.parent
     last_message_id = None
-    project_path = Path(project_dir)
+    handled_ids: set[str] = set()  # Message IDs already picked up by this loop
+    last_messages_stat = None  # (mtime_ns, size) of .messages.json when last read
     consecutive_errors = 0
     max_consecutive_errors = PROGRESS_LIMITS["MAX_CONSECUTIVE_ERRORS"]
 
-    print(
-        json.dumps(
-            {
-                "type": "message_loop_started",
-                "message": "Listening for follow-up messages",
-            }
+    # Wake up only when the message or kill file changes, or the project
+    # directory itself is deleted. The timeout is a fallback for platforms
+    # that don't report deleting the watched directory.
+    changes = None
+    if awatch is not None:
+        changes = awatch(
+            project_dir,
+            watch_filter=lambda _, path: (
+                path == project_dir or Path(path).name in (".messages.json", ".kill")
+            ),
+            recursive=False,
+            rust_timeout=30_000,
+            yield_on_timeout=True,
         )
-        + "\n",
-        flush=True,
-        end="",
+
+    emit_event(
+        {
+            "type": "message_loop_started",
+            "message": "Listening for follow-up messages",
+        }
     )
 
     while True:
         try:
             # Check if project directory still exists - exit if deleted
             if not project_path.exists():
-                print(
-                    json.dumps(
-                        {
-                            "type": "log",
-                            "message": "Project directory no longer exists. Exiting message loop.",
-                        }
-                    )
-                    + "\n",
-                    flush=True,
-                    end="",
+                emit_event(
+                    {
+                        "type": "log",
+                        "message": "Project directory no longer exists. Exiting message loop.",
+                    }
                 )
                 return
 
             # Check for kill signal
-            kill_file = project_path / ".kill"
             if kill_file.exists():
-                print(
-                    json.dumps(
-                        {
-                            "type": "log",
-                            "message": "Received kill signal. Exiting message loop.",
-                        }
-                    )
-                    + "\n",
-                    flush=True,
-                    end="",
+                emit_event(
+                    {
+                        "type": "log",
+                        "message": "Received kill signal. Exiting message loop.",
+                    }
                 )
                 return
 
-            # Check for new messages
-            if messages_file.exists():
-                messages = json.loads(messages_file.read_text())
+            # Check for new messages, skipping the read while the file is unchanged
+            try:
+                st = messages_file.stat()
+                messages_stat = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                messages_stat = None
+
+            if messages_stat is not None and messages_stat != last_messages_stat:
+                messages = json_loads(await asyncio.to_thread(messages_file.read_bytes))
 
                 # Find unprocessed messages
                 for msg in messages:
-                    if msg.get("id") != last_message_id and not msg.get("processed"):
+                    if msg.get("id") not in handled_ids and not msg.get("processed"):
                         last_message_id = msg.get("id")
+                        handled_ids.add(last_message_id)
                         user_message = msg.get("content", "")
 
-                        print(
-                            json.dumps(
-                                {
-                                    "type": "user_message_received",
-                                    "message": user_message,
-                                }
-                            )
-                            + "\n",
-                            flush=True,
-                            end="",
+                        emit_event(
+                            {
+                                "type": "user_message_received",
+                                "message": user_message,
+                            }
                         )
 
                         # Update progress - starting follow-up research
@@ -496,10 +837,9 @@ async def message_loop(llm, project_dir: str):
 
                         # Build a proper research continuation prompt
                         try:
-                            prompts_dir = Path(__file__).parent / "prompts"
-                            continuation_template = (
-                                prompts_dir / "continuation-instruction.txt"
-                            ).read_text()
+                            continuation_template = load_prompt(
+                                "prompts/continuation-instruction.txt"
+                            )
                         except Exception as e:
                             raise RuntimeError(
                                 f"Failed to load continuation prompt file: {e}"
@@ -507,19 +847,16 @@ async def message_loop(llm, project_dir: str):
 
                         continuation_prompt = continuation_template.format(
                             user_message=user_message,
-                            current_time=datetime.now().strftime(
-                                "%Y-%m-%d %H:%M:%S %Z"
+                            current_time=datetime.now().isoformat(
+                                sep=" ", timespec="seconds"
                             ),
                         )
 
-                        print(
-                            json.dumps(
-                                {
-                                    "type": "llm_starting",
-                                    "topic": user_message,
-                                }
-                            ),
-                            flush=True,
+                        emit_event(
+                            {
+                                "type": "llm_starting",
+                                "topic": user_message,
+                            }
                         )
 
                         await update_progress(
@@ -527,29 +864,17 @@ async def message_loop(llm, project_dir: str):
                         )
 
                         # Process the message with the LLM
-                        from mcp_agent.workflows.llm.augmented_llm import RequestParams
-
-                        request_params = RequestParams(
-                            max_iterations=999999,
-                            temperature=0.7,
-                            maxTokens=16384,
-                        )
-
+                        flush_events()
                         response = await llm.generate_str(
                             message=continuation_prompt,
-                            request_params=request_params,
+                            request_params=_REQUEST_PARAMS,
                         )
 
-                        print(
-                            json.dumps(
-                                {
-                                    "type": "llm_completed",
-                                    "status": "success",
-                                }
-                            )
-                            + "\n",
-                            flush=True,
-                            end="",
+                        emit_event(
+                            {
+                                "type": "llm_completed",
+                                "status": "success",
+                            }
                         )
 
                         await update_progress(
@@ -559,9 +884,15 @@ async def message_loop(llm, project_dir: str):
                         # Mark message as processed
                         msg["processed"] = True
                         msg["response"] = response
-                        msg["processed_at"] = datetime.utcnow().isoformat()
-
-                        messages_file.write_text(json.dumps(messages, indent=2))
+                        msg["processed_at"] = utc_timestamp()
+
+                        # Atomic so the web app, which rewrites this file to add
+                        # messages, never parses a half-written array
+                        write_in_background(
+                            write_atomic,
+                            messages_file,
+                            json_dumps(messages, indent=True),
+                        )
 
                         await update_progress(
                             project_dir,
@@ -570,139 +901,116 @@ async def message_loop(llm, project_dir: str):
                             [],
                         )
 
-                        print(
-                            json.dumps(
-                                {
-                                    "type": "message_processed",
-                                    "message_id": last_message_id,
-                                }
-                            )
-                            + "\n",
-                            flush=True,
-                            end="",
+                        emit_event(
+                            {
+                                "type": "message_processed",
+                                "message_id": last_message_id,
+                            }
                         )
 
                         # Parse tool calls from response and emit them individually
                         # The response contains "[Calling tool xxx with args {...}]" patterns
-                        import re
-
-                        # Extract and emit each tool call as a separate activity
-                        tool_call_pattern = (
-                            r"\[Calling tool ([a-zA-Z0-9_.-]+) with args (\{[^}]+\})\]"
-                        )
-                        tool_calls = re.findall(tool_call_pattern, response)
+                        tool_calls = _RESPONSE_TOOL_CALL_RE.findall(response)
 
                         for tool_name, tool_args_str in tool_calls:
                             try:
-                                tool_args = json.loads(tool_args_str)
-                            except json.JSONDecodeError:
+                                tool_args = json_loads(tool_args_str)
+                            except ValueError:
                                 tool_args = tool_args_str
 
                             # Emit tool call activity
-                            print(
-                                json.dumps(
-                                    {
-                                        "type": "tool_call",
-                                        "tool": tool_name,
-                                        "args": tool_args,
-                                        "timestamp": datetime.utcnow().isoformat(),
-                                    }
-                                )
-                                + "\n",
-                                flush=True,
-                                end="",
+                            emit_event(
+                                {
+                                    "type": "tool_call",
+                                    "tool": tool_name,
+                                    "args": tool_args,
+                                    "timestamp": utc_timestamp(),
+                                }
                             )
 
                             # Also emit a tool result placeholder
-                            print(
-                                json.dumps(
-                                    {
-                                        "type": "tool_result",
-                                        "tool": tool_name,
-                                        "result": f"{tool_name} completed",
-                                        "timestamp": datetime.utcnow().isoformat(),
-                                    }
-                                )
-                                + "\n",
-                                flush=True,
-                                end="",
+                            emit_event(
+                                {
+                                    "type": "tool_result",
+                                    "tool": tool_name,
+                                    "result": f"{tool_name} completed",
+                                    "timestamp": utc_timestamp(),
+                                }
                             )
 
                         # Extract just the final text response (not tool call logs)
                         # Remove tool call patterns like "[Calling tool xxx with args {...}]"
-                        clean_response = re.sub(
-                            r"\[Calling tool [^\]]+\]", "", response
+                        clean_response = _RESPONSE_TOOL_MARKER_RE.sub(
+                            "", response
                         ).strip()
 
                         # Clean up extra whitespace from removed tool calls
-                        clean_response = re.sub(
-                            r"\n\s*\n", "\n\n", clean_response
+                        clean_response = _BLANK_LINES_RE.sub(
+                            "\n\n", clean_response
                         ).strip()
 
                         # Only emit if there's actual content after removing tool calls
                         if clean_response:
-                            print(
-                                json.dumps(
-                                    {
-                                        "type": "assistant_response",
-                                        "message_id": last_message_id,
-                                        "response": clean_response,
-                                    }
-                                )
-                                + "\n",
-                                flush=True,
-                                end="",
-                            )
-
-                        # Mark research as completed (for UI status)
-                        print(
-                            json.dumps(
+                            emit_event(
                                 {
-                                    "type": "research_fully_completed",
-                                    "status": "success",
+                                    "type": "assistant_response",
+                                    "message_id": last_message_id,
+                                    "response": clean_response,
                                 }
                             )
-                            + "\n",
-                            flush=True,
-                            end="",
+
+                        # Mark research as completed (for UI status)
+                        emit_event(
+                            {
+                                "type": "research_fully_completed",
+                                "status": "success",
+                            }
                         )
 
-            # Sleep briefly before checking again
-            await asyncio.sleep(2)
+                # Only once the whole batch is handled: if a message fails, the
+                # next pass re-reads the file and picks up the ones after it
+                last_messages_stat = messages_stat
+
+            # Wait for the next change (or sleep briefly) before checking again
+            if changes is not None:
+                try:
+                    await anext(changes)
+                except Exception as e:
+                    # A watcher that raised is finished; every later anext()
+                    # would fail at once, so fall back to polling for good
+                    changes = None
+                    emit_event(
+                        {
+                            "type": "log",
+                            "message": f"File watcher stopped ({e}); polling for messages instead",
+                        }
+                    )
+            else:
+                await asyncio.sleep(_MESSAGE_POLL_SECONDS)
             # Reset error counter on successful iteration
             consecutive_errors = 0
 
         except Exception as e:
             consecutive_errors += 1
-            print(
-                json.dumps(
-                    {
-                        "type": "message_loop_error",
-                        "error": str(e),
-                        "consecutive_errors": consecutive_errors,
-                    }
-                )
-                + "\n",
-                flush=True,
-                end="",
+            emit_event(
+                {
+                    "type": "message_loop_error",
+                    "error": str(e),
+                    "consecutive_errors": consecutive_errors,
+                }
             )
 
             # Exit if too many consecutive errors (likely unrecoverable)
             if consecutive_errors >= max_consecutive_errors:
-                print(
-                    json.dumps(
-                        {
-                            "type": "log",
-                            "message": f"Exiting after {consecutive_errors} consecutive errors",
-                        }
-                    )
-                    + "\n",
-                    flush=True,
-                    end="",
+                emit_event(
+                    {
+                        "type": "log",
+                        "message": f"Exiting after {consecutive_errors} consecutive errors",
+                    }
                 )
                 return
 
-            await asyncio.sleep(5)
+            await asyncio.sleep(_MESSAGE_ERROR_RETRY_SECONDS)
 
 
 async def run_research(
@@ -720,81 +1028,17 @@ async def run_research(
 
     completed_tasks = []
 
-    # Configure logging:
-    # 1. mcp-agent logs -> stderr (so they don't pollute stdout JSON stream)
-    # 2. ToolCallHandler -> stdout (JSON messages for ResearchManager)
-
-    # 1. Hijack sys.stdout to ensure NOTHING uses it except us
-    original_stdout = sys.stdout
-    sys.stdout = sys.stderr  # Redirect all standard print() calls to stderr by default
-
-    # 2. Create a wrapper to write purely to the real stdout for our JSON protocol
-    class ProtocolWriter:
-        def write(self, msg):
-            original_stdout.write(msg)
-            original_stdout.flush()
-
-        def flush(self):
-            original_stdout.flush()
-
-    protocol_out = ProtocolWriter()
-
-    # 3. Configure root logger to write to stderr (which is also sys.stdout now)
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
-
-    # Remove ALL existing handlers from root and mcp_agent
-    root_logger.handlers = []
-    logging.getLogger("mcp_agent").handlers = []
-
-    # StreamHandler to stderr for all normal logs
-    stderr_handler = logging.StreamHandler(sys.stderr)
-    stderr_handler.setFormatter(
-        logging.Formatter("[%(levelname)s] %(name)s: %(message)s")
-    )
-    root_logger.addHandler(stderr_handler)
-
-    # Restore stdout
-    sys.stdout = original_stdout
-
-    # Remove handlers from ALL loggers
-    for name in logging.root.manager.loggerDict:
-        logger = logging.getLogger(name)
-        logger.handlers = []
-        logger.propagate = True
-
-    root_logger.handlers = []
-
-    # Re-add stderr handler to root
-    root_logger.addHandler(stderr_handler)
-
-    # SILENCE NOISY LOGGERS explicitly
-    noisy_loggers = [
-        "mcp_agent.workflows.llm.augmented_llm_anthropic",
-        "mcp_agent.workflows.llm.augmented_llm_openai",
-        "httpcore",
-        "httpx",
-    ]
-    for logger_name in noisy_loggers:
-        logging.getLogger(logger_name).setLevel(logging.INFO)
-
-    # ToolCallHandler to stdout for structured JSON
-    tool_handler = ToolCallHandler()
-    tool_handler.setLevel(logging.DEBUG)
+    configure_logging()
     ToolCallHandler.project_dir = project_dir
-    root_logger.addHandler(tool_handler)
 
-    # Create a temporary config file with project-specific filesystem path
+    # Build the mcp-agent settings with the project-specific filesystem path
     import os
-    import tempfile
-    import yaml
 
     # Load base config (get absolute path to project root config)
     script_dir = Path(__file__).parent.parent  # Go up from scripts/ to project root
     base_config_path = script_dir / "mcp_agent.config.yaml"
 
-    with open(base_config_path, "r") as f:
-        config = yaml.safe_load(f)
+    config = load_base_config(base_config_path)
 
     # Override filesystem server to use our custom Python server with allowed directory
     config["mcp"]["servers"]["filesystem"]["args"] = [
@@ -819,54 +1063,35 @@ async def run_research(
         config["logger"] = {}
     config["logger"]["transports"] = []
 
-    # Write temporary config file
-    temp_config_fd, temp_config_path = tempfile.mkstemp(suffix=".yaml", text=True)
-    with os.fdopen(temp_config_fd, "w") as f:
-        yaml.dump(config, f)
-
-    print(
-        json.dumps(
-            {
-                "type": "init",
-                "project_dir": project_dir,
-                "topic": topic,
-                "provider": provider,
-                "model": model,
-            }
-        )
-        + "\n",
-        flush=True,
-        end="",
+    # Build settings in memory rather than round-tripping through a temp file
+    settings = Settings(**config)
+
+    emit_event(
+        {
+            "type": "init",
+            "project_dir": project_dir,
+            "topic": topic,
+            "provider": provider,
+            "model": model,
+        }
     )
 
     await update_progress(project_dir, 0, "Initializing", completed_tasks)
 
-    print(
-        json.dumps(
-            {
-                "type": "config_created",
-                "path": temp_config_path,
-                "filesystem_path": os.path.abspath(project_dir),
-            }
-        )
-        + "\n",
-        flush=True,
-        end="",
+    emit_event(
+        {
+            "type": "config_created",
+            "path": str(base_config_path),
+            "filesystem_path": os.path.abspath(project_dir),
+        }
     )
 
-    # Create MCPApp with our custom config file (pass path directly)
-    app = MCPApp(name="research_wizard", settings=temp_config_path)
-
-    # Clean up temp config file immediately after loading
-    try:
-        os.remove(temp_config_path)
-    except OSError:
-        pass
+    # Create MCPApp with our customized settings
+    app = MCPApp(name="research_wizard", settings=settings)
 
     # Load instruction prompt from file
     try:
-        prompts_dir = Path(__file__).parent / "prompts"
-        instruction_template = (prompts_dir / "research-instruction.txt").read_text()
+        instruction_template = load_prompt("prompts/research-instruction.txt")
     except Exception as e:
         raise RuntimeError(f"Failed to load prompt file: {e}")
 
@@ -875,7 +1100,7 @@ async def run_research(
         topic=topic,
         depth_instruction=get_depth_instruction(depth),
         style_instruction=get_style_instruction(style),
-        current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S %Z"),
+        current_time=datetime.now().isoformat(sep=" ", timespec="seconds"),
     )
 
     completed_tasks.append("Created app configuration")
@@ -889,41 +1114,34 @@ async def run_research(
             logger.info(f"Config file: {os.environ.get('MCP_CONFIG_PATH', 'default')}")
             logger.info(f"Project directory: {os.path.abspath(project_dir)}")
 
-            print(
-                json.dumps(
-                    {
-                        "type": "app_started",
-                        "project_dir": os.path.abspath(project_dir),
-                    }
-                )
-                + "\n",
-                flush=True,
-                end="",
+            emit_event(
+                {
+                    "type": "app_started",
+                    "project_dir": os.path.abspath(project_dir),
+                }
             )
 
             # Create research agent with web-research-assistant AND filesystem servers
-            print(
-                json.dumps(
-                    {
-                        "type": "connecting_servers",
-                        "servers": ["web-research-assistant", "filesystem"],
-                    }
-                )
-                + "\n",
-                flush=True,
-                end="",
+            emit_event(
+                {
+                    "type": "connecting_servers",
+                    "servers": ["web-research-assistant", "filesystem"],
+                }
             )
 
             # Load system prompt from template file
-            system_prompt_file = Path(__file__).parent / "system-prompt.template.txt"
-            if not system_prompt_file.exists():
+            try:
+                system_prompt = load_prompt("system-prompt.template.txt")
+            except FileNotFoundError:
                 raise FileNotFoundError(
-                    f"System prompt template not found: {system_prompt_file}"
-                )
-
-            system_prompt = system_prompt_file.read_text()
-
-            # Combine system prompt with task-specific instruction
+                    "System prompt template not found: "
+                    f"{Path(__file__).parent / 'system-prompt.template.txt'}"
+                ) from None
+
+            # Combine system prompt with task-specific instruction. The per-run
+            # values (time, topic, depth, style) come last in the instruction, so
+            # everything before them is an identical prefix across runs that
+            # provider prompt caching can reuse.
             full_system_prompt = system_prompt + "\n\n" + instruction
 
             completed_tasks.append("Connected to MCP servers")
@@ -931,200 +1149,147 @@ async def run_research(
                 project_dir, 20, "Initializing Research Agent", completed_tasks
             )
 
-            # Change to project directory BEFORE creating agent
-            # This ensures any relative paths used by the agent are relative to project dir
-            import os
-
-            original_dir = os.getcwd()
-            os.chdir(project_dir)
-
-            try:
-                # Initialize Agent
-                # Note: We pass the full instruction here.
-                # The agent will have access to the context (servers)
-                agent = Agent(
-                    name="ResearchAgent",
-                    instruction=full_system_prompt,
-                    server_names=["web-research-assistant", "filesystem"],
-                    context=running_app.context,
-                )
-
-                # Initialize the agent (connects to MCP servers)
-                await agent.initialize()
-
-                # Attach LLM based on provider
-                from mcp_agent.workflows.llm.augmented_llm_anthropic import (
-                    AnthropicAugmentedLLM,
-                )
-                from mcp_agent.workflows.llm.augmented_llm_openai import (
-                    OpenAIAugmentedLLM,
-                )
-
-                if provider == "openai":
-                    llm = await agent.attach_llm(OpenAIAugmentedLLM)
-                else:
-                    llm = await agent.attach_llm(AnthropicAugmentedLLM)
+            # Initialize Agent
+            # The process CWD is left alone: the filesystem server resolves
+            # relative paths against the project directory it was given.
+            # Note: We pass the full instruction here.
+            # The agent will have access to the context (servers)
+            agent = Agent(
+                name="ResearchAgent",
+                instruction=full_system_prompt,
+                server_names=["web-research-assistant", "filesystem"],
+                context=running_app.context,
+            )
 
-                print(
-                    json.dumps(
-                        {
-                            "type": "progress",
-                            "message": f"Initialized Agent with {provider}",
-                            "percentage": 30,
-                        }
-                    ),
-                    flush=True,
-                )
+            # Initialize the agent (connects to MCP servers)
+            await agent.initialize()
 
-                completed_tasks.append("Initialized research agent")
-                await update_progress(
-                    project_dir, 30, "Starting research", completed_tasks
-                )
+            # Attach LLM based on provider
+            from mcp_agent.workflows.llm.augmented_llm_anthropic import (
+                AnthropicAugmentedLLM,
+            )
+            from mcp_agent.workflows.llm.augmented_llm_openai import (
+                OpenAIAugmentedLLM,
+            )
 
-                print(
-                    json.dumps({"type": "research_started", "cwd": project_dir}),
-                    flush=True,
-                )
+            if provider == "openai":
+                llm = await agent.attach_llm(OpenAIAugmentedLLM)
+            else:
+                llm = await agent.attach_llm(AnthropicAugmentedLLM)
 
-                print(json.dumps({"type": "llm_starting", "topic": topic}), flush=True)
+            emit_event(
+                {
+                    "type": "progress",
+                    "message": f"Initialized Agent with {provider}",
+                    "percentage": 30,
+                }
+            )
 
-                # Process the research request using generate_str
-                from mcp_agent.workflows.llm.augmented_llm import RequestParams
+            completed_tasks.append("Initialized research agent")
+            await update_progress(
+                project_dir, 30, "Starting research", completed_tasks
+            )
 
-                request_params = RequestParams(
-                    max_iterations=999999,
-                    temperature=0.7,
-                    maxTokens=16384,
-                )
+            emit_event({"type": "research_started", "cwd": project_dir})
 
-                result = await llm.generate_str(
-                    message=topic,
-                    request_params=request_params,
-                )
+            emit_event({"type": "llm_starting", "topic": topic})
 
-                completed_tasks.append("Completed web research")
-                await update_progress(
-                    project_dir,
-                    90,
-                    "Research completed",
-                    completed_tasks,
-                )
+            # Process the research request using generate_str
+            flush_events()
+            result = await llm.generate_str(
+                message=topic,
+                request_params=_REQUEST_PARAMS,
+            )
 
-                print(
-                    json.dumps(
-                        {
-                            "type": "llm_completed",
-                            "status": "success",
-                        }
-                    ),
-                    flush=True,
-                )
+            completed_tasks.append("Completed web research")
+            await update_progress(
+                project_dir,
+                90,
+                "Research completed",
+                completed_tasks,
+            )
 
-                completed_tasks.append("Completed research")
-                await update_progress(project_dir, 100, "Complete", completed_tasks)
+            emit_event(
+                {
+                    "type": "llm_completed",
+                    "status": "success",
+                }
+            )
 
-                print(
-                    json.dumps(
-                        {
-                            "type": "research_completed",
-                            "status": "success",
-                        }
-                    ),
-                    flush=True,
-                )
+            completed_tasks.append("Completed research")
+            await update_progress(project_dir, 100, "Complete", completed_tasks)
 
-                # Emit the final research result
-                print(
-                    json.dumps(
-                        {
-                            "type": "assistant_response",
-                            "message_id": None,
-                            "response": result,
-                        }
-                    )
-                    + "\n",
-                    flush=True,
-                    end="",
-                )
+            emit_event(
+                {
+                    "type": "research_completed",
+                    "status": "success",
+                }
+            )
 
-                # Signal that initial research is complete
-                print(
-                    json.dumps(
-                        {
-                            "type": "research_fully_completed",
-                            "status": "success",
-                        }
-                    )
-                    + "\n",
-                    flush=True,
-                    end="",
-                )
+            # Emit the final research result
+            emit_event(
+                {
+                    "type": "assistant_response",
+                    "message_id": None,
+                    "response": result,
+                }
+            )
 
-                # Enter message loop
-                print(
-                    json.dumps(
-                        {
-                            "type": "waiting_for_messages",
-                            "message": "Research complete. Waiting for follow-up questions...",
-                        }
-                    )
-                    + "\n",
-                    flush=True,
-                    end="",
-                )
+            # Signal that initial research is complete
+            emit_event(
+                {
+                    "type": "research_fully_completed",
+                    "status": "success",
+                }
+            )
 
-                await message_loop(llm, project_dir)
+            # Enter message loop
+            emit_event(
+                {
+                    "type": "waiting_for_messages",
+                    "message": "Research complete. Waiting for follow-up questions...",
+                }
+            )
 
-                return {"success": True, "status": "completed"}
+            await message_loop(llm, project_dir)
 
-            finally:
-                os.chdir(original_dir)
+            return {"success": True, "status": "completed"}
 
     except Exception as e:
-        print(
-            json.dumps(
-                {
-                    "type": "error",
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                }
-            )
-            + "\n",
-            flush=True,
-            end="",
+        emit_event(
+            {
+                "type": "error",
+                "error": str(e),
+                "error_type": type(e).__name__,
+            }
         )
 
         await update_progress(project_dir, 100, "Failed", completed_tasks)
 
         return {"success": False, "error": str(e)}
 
-    finally:
-        # Clean up temporary config file
-        if "temp_config_path" in locals():
-            try:
-                os.unlink(temp_config_path)
-            except:
-                pass
-
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 3:
-        print(
-            json.dumps(
-                {
-                    "type": "error",
-                    "error": "Usage: research-agent.py <topic> <project_dir> [provider] [model] [--resume]",
-                }
-            ),
-            flush=True,
+    argv = sys.argv
+    nargs = len(argv)
+    if nargs < 3:
+        emit_event(
+            {
+                "type": "error",
+                "error": "Usage: research-agent.py <topic> <project_dir> [provider] [model] [--resume]",
+            }
         )
         sys.exit(1)
 
-    topic = sys.argv[1]
-    project_dir = sys.argv[2]
-    provider = sys.argv[3] if len(sys.argv) > 3 else "anthropic"
-    model = sys.argv[4] if len(sys.argv) > 4 else "claude-sonnet-4-5"
+    topic, project_dir = argv[1], argv[2]
+    # Positional provider/model are optional; don't mistake a flag for them
+    provider = (
+        argv[3] if nargs > 3 and not argv[3].startswith("--") else "anthropic"
+    )
+    model = (
+        argv[4] if nargs > 4 and not argv[4].startswith("--") else "claude-sonnet-4-5"
+    )
 
     # Handle "auto" model - replace with actual default model for the provider
     # "auto" is not a valid model name for any LLM provider
@@ -1137,7 +1302,7 @@ def main():
             model = "claude-sonnet-4-5"  # Default fallback
 
     # Check for --resume flag
-    resume = "--resume" in sys.argv
+    resume = "--resume" in argv[3:]
 
     # CRITICAL: Convert project_dir to absolute path BEFORE any operations
     # This ensures relative paths work correctly regardless of where script is run
@@ -1145,8 +1310,10 @@ def main():
 
     project_dir = os.path.abspath(project_dir)
 
-    # Create the project directory if it doesn't exist
-    os.makedirs(project_dir, exist_ok=True)
+    # Create the project directory if it doesn't exist (resumed and web-app
+    # projects already do, so stat before attempting the mkdir)
+    if not os.path.isdir(project_dir):
+        os.makedirs(project_dir, exist_ok=True)
 
     # Run async research
     result = asyncio.run(
@@ -6,9 +6,34 @@ Follows DRY principle - these were previously duplicated in
 filesystem-server.py and research-agent.py.
 """
 
+import os
 import re
+import time
+from collections import OrderedDict
 from pathlib import Path
 
+# Match href="..." and src="..." attributes pointing at local files.
+# External URLs, anchors, and data URIs are rejected by the lookahead, and
+# the capture stops before any query string or anchor.
+_LOCAL_LINK_RE = re.compile(
+    r"""(?:href|src)=["'](?!https?://|mailto:|#|data:|javascript:)([^"'?#]*)[^"']*["']""",
+    re.IGNORECASE,
+)
+
+# Parsed links per HTML file, keyed by path and validated by (mtime_ns, size)
+_LINKS_CACHE: "OrderedDict[Path, tuple[int, int, frozenset[str]]]" = OrderedDict()
+_LINKS_CACHE_MAX = 1024
+
+# Link targets recently found missing, mapped to the monotonic time of the probe
+_NEG_CACHE: dict[str, float] = {}
+_NEG_CACHE_TTL = 1.0  # seconds
+_NEG_CACHE_MAX = 4096
+
+
+def clear_missing_cache() -> None:
+    """Forget cached missing link targets (call after creating files)."""
+    _NEG_CACHE.clear()
+
 
 def extract_local_links_from_html(html_content: str) -> set[str]:
     """
@@ -20,25 +45,35 @@ def extract_local_links_from_html(html_content: str) -> set[str]:
     Returns:
         Set of local file links found in the HTML
     """
-    links: set[str] = set()
+    # Skip-prefixes and query/anchor stripping are folded into the regex
+    return {
+        link for link in _LOCAL_LINK_RE.findall(html_content) if link.strip()
+    }
 
-    # Match href="..." and src="..." attributes
-    pattern = r'(?:href|src)=["\']([^"\']+)["\']'
-    matches = re.findall(pattern, html_content, re.IGNORECASE)
 
-    for link in matches:
-        # Skip external URLs, anchors, and data URIs
-        if link.startswith(
-            ("http://", "https://", "mailto:", "#", "data:", "javascript:")
-        ):
-            continue
-        # Skip empty links
-        if not link.strip():
-            continue
-        # Remove query strings and anchors from local links
-        link = link.split("?")[0].split("#")[0]
-        if link:
-            links.add(link)
+def _get_local_links(html_file: Path) -> frozenset[str]:
+    """
+    Return the local links of an HTML file, re-parsing only if it changed.
+
+    Args:
+        html_file: Path to the HTML file
+
+    Returns:
+        Frozen set of local file links found in the file
+    """
+    st = os.stat(html_file)
+    cached = _LINKS_CACHE.get(html_file)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        _LINKS_CACHE.move_to_end(html_file)
+        return cached[2]
+
+    content = html_file.read_text(encoding="utf-8")
+    links = frozenset(extract_local_links_from_html(content))
+
+    _LINKS_CACHE[html_file] = (st.st_mtime_ns, st.st_size, links)
+    _LINKS_CACHE.move_to_end(html_file)
+    if len(_LINKS_CACHE) > _LINKS_CACHE_MAX:
+        _LINKS_CACHE.popitem(last=False)
 
     return links
 
@@ -55,36 +90,64 @@ def check_missing_files_in_project(project_dir: Path) -> dict[str, list[str]]:
     """
     missing_files: dict[str, list[str]] = {}
 
-    # Find all HTML files in the project
-    html_files = list(project_dir.glob("*.html")) + list(project_dir.glob("**/*.html"))
-
+    # Find all HTML files in the project with a single directory walk, and
+    # index every path seen so links to existing files need no extra stat
+    html_files: list[Path] = []
+    existing: set[str] = set()
+    for root, dirs, files in os.walk(project_dir):
+        for name in dirs:
+            existing.add(os.path.join(root, name))
+        for name in files:
+            existing.add(os.path.join(root, name))
+            if name.endswith(".html"):
+                html_files.append(Path(root) / name)
+    if not html_files:
+        return missing_files
+
+    # Pass 1: collect the link targets to probe (unchanged files hit the cache)
+    probes: list[tuple[Path, str, str]] = []
     for html_file in html_files:
         try:
-            content = html_file.read_text(encoding="utf-8")
-            local_links = extract_local_links_from_html(content)
-
-            missing_for_file = []
-            for link in local_links:
-                # Resolve the link relative to the HTML file's directory
-                if link.startswith("/"):
-                    # Absolute path from project root
-                    linked_path = project_dir / link.lstrip("/")
-                else:
-                    # Relative path from HTML file location
-                    linked_path = html_file.parent / link
-
-                # Check if the file exists
-                if not linked_path.exists():
-                    missing_for_file.append(link)
-
-            if missing_for_file:
-                # Use relative path from project dir for cleaner output
-                rel_html_path = html_file.relative_to(project_dir)
-                missing_files[str(rel_html_path)] = missing_for_file
-
+            local_links = _get_local_links(html_file)
         except Exception:
             # Skip files that can't be read
-            pass
+            continue
+
+        for link in local_links:
+            # Resolve the link relative to the HTML file's directory
+            if link.startswith("/"):
+                # Absolute path from project root
+                linked_path = project_dir / link.lstrip("/")
+            else:
+                # Relative path from HTML file location
+                linked_path = html_file.parent / link
+            # Normalize so e.g. "style.css" and "sub/../style.css" share a probe
+            probes.append((html_file, link, os.path.normpath(linked_path)))
+
+    # Pass 2: stat each unique target not found by the walk once, trusting
+    # recent misses (targets outside the project or spelled differently from
+    # the walk still get a real existence check)
+    now = time.monotonic()
+    if len(_NEG_CACHE) > _NEG_CACHE_MAX:
+        _NEG_CACHE.clear()
+    missing_targets: set[str] = set()
+    for target in {target for _, _, target in probes}:
+        if target in existing:
+            _NEG_CACHE.pop(target, None)
+        elif now - _NEG_CACHE.get(target, float("-inf")) < _NEG_CACHE_TTL:
+            missing_targets.add(target)
+        elif os.path.exists(target):
+            _NEG_CACHE.pop(target, None)
+        else:
+            _NEG_CACHE[target] = now
+            missing_targets.add(target)
+
+    # Pass 3: map missing targets back to the HTML files that reference them
+    for html_file, link, target in probes:
+        if target in missing_targets:
+            # Use relative path from project dir for cleaner output
+            rel_html_path = str(html_file.relative_to(project_dir))
+            missing_files.setdefault(rel_html_path, []).append(link)
 
     return missing_files
 
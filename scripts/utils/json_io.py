@@ -0,0 +1,98 @@
+"""
+JSON I/O Utilities
+
+Shared helpers for encoding JSON and persisting JSON state files.
+Uses orjson when it is installed and falls back to the standard library,
+so both filesystem-server.py and research-agent.py stay dependency-light.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None  # type: ignore[assignment]
+
+
+def dumps(obj: Any, indent: bool = False, newline: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Args:
+        obj: JSON-serializable object
+        indent: Pretty-print with 2-space indentation
+        newline: Append a trailing newline (one line of a JSON-lines stream)
+
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, option=option)
+    if indent:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    else:
+        data = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode(
+            "utf-8"
+        )
+    return data + b"\n" if newline else data
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Parse a JSON document from bytes or str.
+
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_atomic(path: Path | str, data: bytes) -> None:
+    """
+    Write a file atomically (temp file + os.replace).
+
+    Readers never observe a partially written file.
+
+    Args:
+        path: Destination file
+        data: File contents
+    """
+    # Hidden temp name in the same directory so os.replace stays atomic and
+    # file watchers that skip dotfiles ignore it
+    directory, name = os.path.split(os.fspath(path))
+    tmp_path = os.path.join(directory, f".{name}.tmp.{os.getpid()}")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path: Path | str, obj: Any, indent: bool = True) -> bytes:
+    """
+    Write a JSON file atomically (see write_atomic).
+
+    Args:
+        path: Destination file
+        obj: JSON-serializable object
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        The bytes that were written
+    """
+    payload = dumps(obj, indent=indent)
+    write_atomic(path, payload)
+    return payload
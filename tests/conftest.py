@@ -0,0 +1,64 @@
+"""
+Shared fixtures for tests that load scripts/research-agent.py itself.
+"""
+
+import importlib.util
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+RESEARCH_AGENT_PATH = SCRIPTS_DIR / "research-agent.py"
+
+
+class _Stub:
+    def __init__(self, *args, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _load_research_agent():
+    """Import research-agent.py, stubbing mcp_agent if it is not installed."""
+    saved = {}
+    try:
+        import mcp_agent  # noqa: F401
+    except ImportError:
+        stubs = {
+            "mcp_agent": {},
+            "mcp_agent.app": {"MCPApp": _Stub},
+            "mcp_agent.agents": {},
+            "mcp_agent.agents.agent": {"Agent": _Stub},
+            "mcp_agent.config": {"Settings": _Stub, "LoggerSettings": _Stub},
+            "mcp_agent.workflows": {},
+            "mcp_agent.workflows.llm": {},
+            "mcp_agent.workflows.llm.augmented_llm": {"RequestParams": _Stub},
+        }
+        for name, attrs in stubs.items():
+            module = types.ModuleType(name)
+            module.__dict__.update(attrs)
+            saved[name] = sys.modules.get(name)
+            sys.modules[name] = module
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "research_agent", RESEARCH_AGENT_PATH
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        sys.path.remove(str(SCRIPTS_DIR))
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+@pytest.fixture(scope="session")
+def agent():
+    """The research-agent.py module, loaded once per test session."""
+    return _load_research_agent()
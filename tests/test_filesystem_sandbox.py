@@ -0,0 +1,322 @@
+"""
+Sandbox tests for mcp-servers/filesystem-server.py.
+
+Unlike test_filesystem_server.py, these tests load the real server module so
+the path checks that guard the sandbox boundary are exercised directly. The
+MCP SDK is stubbed when it is not installed; only FastMCP's tool decorator
+is needed to import the module.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+from pathlib import Path
+
+try:
+    import pytest
+except ImportError:
+    print("pytest not installed. Run: pip install pytest")
+    sys.exit(1)
+
+
+SERVER_PATH = Path(__file__).parent.parent / "mcp-servers" / "filesystem-server.py"
+
+
+class _StubFastMCP:
+    """Just enough of FastMCP to import the server module."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def tool(self):
+        return lambda func: func
+
+    def run(self):
+        pass
+
+
+def _load_server():
+    """Import filesystem-server.py, stubbing mcp.server.fastmcp if needed."""
+    saved = {}
+    try:
+        import mcp.server.fastmcp  # noqa: F401
+    except ImportError:
+        fastmcp = types.ModuleType("mcp.server.fastmcp")
+        fastmcp.FastMCP = _StubFastMCP
+        for name, module in (
+            ("mcp", types.ModuleType("mcp")),
+            ("mcp.server", types.ModuleType("mcp.server")),
+            ("mcp.server.fastmcp", fastmcp),
+        ):
+            saved[name] = sys.modules.get(name)
+            sys.modules[name] = module
+
+    try:
+        spec = importlib.util.spec_from_file_location("filesystem_server", SERVER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+fs = _load_server()
+
+
+@pytest.fixture
+def sandbox():
+    """A temporary root with an allowed 'project' dir and an 'outside' dir."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir).resolve()
+        project = root / "project"
+        outside = root / "outside"
+        project.mkdir()
+        outside.mkdir()
+        (outside / "secret.txt").write_text("top secret")
+        fs.set_allowed_directories([str(project)])
+        yield root, project, outside
+    fs.set_allowed_directories([])
+
+
+class TestResolveAllowed:
+    """Test the path checks every tool runs before touching the filesystem."""
+
+    def test_relative_path_resolves_inside_project(self, sandbox):
+        """Relative paths should resolve against the first allowed directory."""
+        _, project, _ = sandbox
+        assert fs._resolve_allowed("notes.txt") == (True, str(project / "notes.txt"))
+        assert fs._resolve_allowed("sub/page.html") == (
+            True,
+            str(project / "sub" / "page.html"),
+        )
+
+    @pytest.mark.parametrize(
+        "path",
+        ["../outside/secret.txt", "sub/../../outside/secret.txt", "../project2/x"],
+    )
+    def test_relative_traversal_rejected(self, sandbox, path):
+        """Relative '..' paths that leave the project should be rejected."""
+        assert fs._resolve_allowed(path)[0] is False
+
+    def test_absolute_traversal_rejected(self, sandbox):
+        """Absolute paths that pass through the project and leave it are rejected."""
+        _, project, _ = sandbox
+        path = f"{project}{os.sep}..{os.sep}outside{os.sep}secret.txt"
+        assert fs._resolve_allowed(path)[0] is False
+
+    def test_traversal_that_stays_inside_allowed(self, sandbox):
+        """'..' segments that stay inside the project should be allowed."""
+        _, project, _ = sandbox
+        path = f"{project}{os.sep}sub{os.sep}..{os.sep}index.html"
+        assert fs._resolve_allowed(path) == (True, str(project / "index.html"))
+
+    def test_project_dir_itself_allowed(self, sandbox):
+        """The allowed directory itself should be accessible."""
+        _, project, _ = sandbox
+        assert fs._resolve_allowed(str(project)) == (True, str(project))
+
+    def test_prefix_sibling_rejected(self, sandbox):
+        """A sibling sharing the project's name as a prefix is not inside it."""
+        root, project, _ = sandbox
+        sibling = root / "project2"
+        sibling.mkdir()
+        (sibling / "x.txt").write_text("x")
+
+        assert fs._resolve_allowed(str(sibling / "x.txt"))[0] is False
+        assert fs._resolve_allowed(str(sibling))[0] is False
+
+    def test_symlinked_alias_of_allowed_dir(self, sandbox):
+        """A project configured through a symlink is reachable by either name."""
+        root, project, _ = sandbox
+        alias = root / "alias"
+        alias.symlink_to(project, target_is_directory=True)
+        fs.set_allowed_directories([str(alias)])
+
+        assert fs._resolve_allowed(str(alias / "a.txt")) == (
+            True,
+            str(project / "a.txt"),
+        )
+        assert fs._resolve_allowed(str(project / "a.txt")) == (
+            True,
+            str(project / "a.txt"),
+        )
+
+    def test_symlink_out_of_project_rejected(self, sandbox):
+        """A symlink inside the project pointing outside it is rejected."""
+        _, project, outside = sandbox
+        (project / "escape").symlink_to(outside, target_is_directory=True)
+
+        assert fs._resolve_allowed("escape/secret.txt")[0] is False
+        assert fs._resolve_allowed(str(project / "escape"))[0] is False
+
+    def test_symlink_planted_after_first_check(self, sandbox):
+        """A path that was allowed must be re-checked once it becomes a symlink."""
+        _, project, outside = sandbox
+        (project / "data").mkdir()
+        (project / "data" / "notes.txt").write_text("inside")
+
+        assert fs._resolve_allowed("data")[0] is True
+        assert fs._resolve_allowed("data/notes.txt")[0] is True
+        assert fs.list_directory("data") == "FILE notes.txt"
+
+        # Swap the checked directory for a link to the outside directory
+        (project / "data" / "notes.txt").unlink()
+        (project / "data").rmdir()
+        (project / "data").symlink_to(outside, target_is_directory=True)
+
+        assert fs._resolve_allowed("data")[0] is False
+        with pytest.raises(ValueError):
+            fs.list_directory("data")
+        with pytest.raises(ValueError):
+            fs.read_file("data/secret.txt")
+
+    def test_file_symlink_planted_after_first_read(self, sandbox):
+        """read_file must not follow a file symlink planted after a first read."""
+        _, project, outside = sandbox
+        (project / "report.txt").write_text("inside")
+        assert fs.read_file("report.txt") == "inside"
+
+        (project / "report.txt").unlink()
+        (project / "report.txt").symlink_to(outside / "secret.txt")
+
+        with pytest.raises(ValueError):
+            fs.read_file("report.txt")
+
+    def test_set_allowed_directories_replaces_previous(self, sandbox):
+        """Reconfiguring allowed directories takes effect for known paths."""
+        root, project, outside = sandbox
+        assert fs._resolve_allowed(str(project / "a.txt"))[0] is True
+        assert fs._resolve_allowed(str(outside / "secret.txt"))[0] is False
+
+        fs.set_allowed_directories([str(outside)])
+
+        assert fs._resolve_allowed(str(project / "a.txt"))[0] is False
+        assert fs._resolve_allowed(str(outside / "secret.txt")) == (
+            True,
+            str(outside / "secret.txt"),
+        )
+        # Relative paths now resolve against the new first directory
+        assert fs._resolve_allowed("secret.txt") == (
+            True,
+            str(outside / "secret.txt"),
+        )
+
+    def test_no_allowed_directories_rejects_everything(self, sandbox):
+        """With no allowed directories configured, every path is rejected."""
+        _, project, _ = sandbox
+        fs.set_allowed_directories([])
+
+        assert fs._resolve_allowed(str(project / "a.txt"))[0] is False
+        assert fs._resolve_allowed("a.txt")[0] is False
+
+
+class TestReadFile:
+    """Test read_file's low-level read path."""
+
+    def test_short_reads_are_continued_to_eof(self, sandbox, monkeypatch):
+        """A pread that returns fewer bytes than asked must not truncate."""
+        _, project, _ = sandbox
+        content = "line one\nline two\n" * 50
+        (project / "notes.txt").write_text(content)
+
+        real_pread = os.pread
+        monkeypatch.setattr(
+            fs.os, "pread", lambda fd, n, offset: real_pread(fd, min(n, 7), offset)
+        )
+
+        assert fs.read_file("notes.txt") == content
+
+    def test_without_pread(self, sandbox, monkeypatch):
+        """Platforms without os.pread fall back to sequential reads."""
+        _, project, _ = sandbox
+        content = "héllo\r\nwörld\n" * 100
+        (project / "notes.txt").write_bytes(content.encode("utf-8"))
+        monkeypatch.delattr(fs.os, "pread")
+
+        assert fs.read_file("notes.txt") == content.replace("\r\n", "\n")
+
+    @pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs os.mkfifo")
+    def test_fifo_rejected_without_blocking(self, sandbox):
+        """Opening a FIFO must not block waiting for a writer."""
+        _, project, _ = sandbox
+        os.mkfifo(project / "pipe")
+
+        result = {}
+
+        def read():
+            try:
+                fs.read_file("pipe")
+            except ValueError as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=read, daemon=True)
+        thread.start()
+        thread.join(timeout=2)
+
+        assert not thread.is_alive(), "read_file blocked opening a FIFO"
+        assert "not a file" in str(result["error"])
+
+    def test_directory_rejected(self, sandbox):
+        """Directories are not readable as files."""
+        _, project, _ = sandbox
+        (project / "sub").mkdir()
+
+        with pytest.raises(ValueError, match="not a file"):
+            fs.read_file("sub")
+
+    def test_large_file_without_madvise(self, sandbox, monkeypatch):
+        """Large files are still mapped where madvise is not available."""
+        _, project, _ = sandbox
+        content = "x" * (fs._MMAP_READ_THRESHOLD + 1)
+        (project / "big.txt").write_text(content)
+        monkeypatch.delattr(fs.mmap, "MADV_SEQUENTIAL", raising=False)
+
+        assert fs.read_file("big.txt") == content
+
+    @pytest.mark.parametrize(
+        "error", [ValueError("cannot mmap an empty file"), OSError()]
+    )
+    def test_large_file_falls_back_when_mmap_fails(self, sandbox, monkeypatch, error):
+        """If the file cannot be mapped, read_file reads it normally."""
+        _, project, _ = sandbox
+        content = "y" * (fs._MMAP_READ_THRESHOLD + 1)
+        (project / "big.txt").write_text(content)
+
+        def failing_mmap(*args, **kwargs):
+            raise error
+
+        monkeypatch.setattr(fs.mmap, "mmap", failing_mmap)
+
+        assert fs.read_file("big.txt") == content
+
+
+class TestUpdateResearchProgress:
+    """Test the progress state the server carries between updates."""
+
+    def test_rereads_file_replaced_with_same_mtime_and_size(self, sandbox):
+        """Another writer's file is re-read even if its mtime and size match."""
+        _, project, _ = sandbox
+        progress_file = project / ".research-progress.json"
+        fs.update_research_progress(10, "Task A", "Doing A", 5)
+        ours = progress_file.read_bytes()
+        st = os.stat(progress_file)
+
+        # The research agent replaces the file with content of the same
+        # size, within the same mtime tick
+        replacement = project / "replacement.json"
+        replacement.write_bytes(ours.replace(b"Task A", b"Task B"))
+        os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(replacement, progress_file)
+
+        fs.update_research_progress(20, "Task C", "Doing C", 5)
+
+        progress = json.loads(progress_file.read_text())
+        assert progress["completedTasks"] == ["Task B", "Task C"]
@@ -0,0 +1,170 @@
+"""
+Tests for the shared HTML link validator in scripts/utils/html_validator.py.
+
+Unlike test_filesystem_server.py, these tests import the real module so
+that optimizations to the shared implementation are checked directly.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+try:
+    import pytest
+except ImportError:
+    print("pytest not installed. Run: pip install pytest")
+    sys.exit(1)
+
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from utils.html_validator import (  # noqa: E402
+    check_missing_files_in_project,
+    clear_missing_cache,
+    extract_local_links_from_html,
+)
+
+
+class TestExtractLocalLinks:
+    """Test link extraction against the real implementation."""
+
+    @pytest.mark.parametrize(
+        "html, expected",
+        [
+            ('<a href="page2.html">Link</a>', {"page2.html"}),
+            ("<img src='image.png'>", {"image.png"}),
+            ('<A HREF="Page.html">Link</A>', {"Page.html"}),
+            ('<a href="page.html?v=1&x=2">Link</a>', {"page.html"}),
+            ('<a href="page.html#section">Link</a>', {"page.html"}),
+            ('<a href="page.html?v=1#section">Link</a>', {"page.html"}),
+            ('<a href="sub/dir/page.html">Link</a>', {"sub/dir/page.html"}),
+            ('<a href="/root.html">Link</a>', {"/root.html"}),
+            ('<a href="my file.html">Link</a>', {"my file.html"}),
+        ],
+    )
+    def test_extracts_local_links(self, html, expected):
+        """Should extract local links and strip query strings and anchors."""
+        assert extract_local_links_from_html(html) == expected
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            '<a href="https://example.com">External</a>',
+            '<a href="http://example.com">External</a>',
+            '<a href="mailto:test@example.com">Email</a>',
+            '<a href="#section">Anchor</a>',
+            '<img src="data:image/png;base64,abc">',
+            '<a href="javascript:void(0)">JS</a>',
+            '<a href="?page=2">Query only</a>',
+            '<a href="">Empty</a>',
+            '<a href="   ">Whitespace</a>',
+            '<a href="unterminated.html>Broken</a>',
+        ],
+    )
+    def test_ignores_non_local_links(self, html):
+        """Should ignore external URLs, anchors, and empty links."""
+        assert extract_local_links_from_html(html) == set()
+
+    def test_deduplicates_links(self):
+        """Should return each link once."""
+        html = '<a href="a.html"></a><a href="a.html#x"></a><a href="a.html"></a>'
+        assert extract_local_links_from_html(html) == {"a.html"}
+
+
+class TestCheckMissingFiles:
+    """Test missing-file detection against the real implementation."""
+
+    def test_reports_missing_links_per_file(self):
+        """Should report missing links keyed by HTML path relative to project."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = Path(tmpdir)
+            (project_dir / "sub").mkdir()
+            (project_dir / "index.html").write_text(
+                '<a href="sub/page.html"></a><a href="missing.html"></a>'
+            )
+            (project_dir / "sub" / "page.html").write_text(
+                '<a href="../index.html"></a><a href="/gone.css"></a>'
+            )
+
+            missing = check_missing_files_in_project(project_dir)
+
+            assert missing == {
+                "index.html": ["missing.html"],
+                str(Path("sub") / "page.html"): ["/gone.css"],
+            }
+
+    def test_top_level_file_reported_once(self):
+        """Should not list the same missing link twice for top-level files."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = Path(tmpdir)
+            (project_dir / "index.html").write_text('<a href="missing.html"></a>')
+
+            missing = check_missing_files_in_project(project_dir)
+
+            assert missing == {"index.html": ["missing.html"]}
+
+    def test_empty_project(self):
+        """Should return an empty dict for projects without HTML files."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assert check_missing_files_in_project(Path(tmpdir)) == {}
+
+    def test_picks_up_edited_file(self):
+        """Should re-scan an HTML file after it changes on disk."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = Path(tmpdir)
+            index_html = project_dir / "index.html"
+            index_html.write_text('<a href="missing.html"></a>')
+            assert check_missing_files_in_project(project_dir) == {
+                "index.html": ["missing.html"]
+            }
+
+            index_html.write_text('<a href="other-missing.html"></a>')
+            assert check_missing_files_in_project(project_dir) == {
+                "index.html": ["other-missing.html"]
+            }
+
+    def test_created_file_found_after_cache_clear(self):
+        """Should stop reporting a file once it is created and the cache cleared."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = Path(tmpdir)
+            (project_dir / "index.html").write_text('<a href="later.html"></a>')
+            assert check_missing_files_in_project(project_dir) == {
+                "index.html": ["later.html"]
+            }
+
+            (project_dir / "later.html").write_text("<p>Now it exists</p>")
+            clear_missing_cache()
+
+            assert check_missing_files_in_project(project_dir) == {}
+
+    def test_shared_missing_target_reported_for_each_file(self):
+        """Should report a shared missing asset under every file linking to it."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = Path(tmpdir)
+            (project_dir / "sub").mkdir()
+            (project_dir / "index.html").write_text('<link href="style.css">')
+            (project_dir / "sub" / "page.html").write_text(
+                '<link href="../style.css"><link href="/style.css">'
+            )
+
+            missing = check_missing_files_in_project(project_dir)
+
+            assert missing["index.html"] == ["style.css"]
+            assert sorted(missing[str(Path("sub") / "page.html")]) == [
+                "../style.css",
+                "/style.css",
+            ]
+
+    def test_existing_targets_outside_walk_not_reported(self):
+        """Should still find existing targets that the project walk doesn't list."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            project_dir = root / "project"
+            (project_dir / "assets").mkdir(parents=True)
+            (root / "shared.css").write_text("body {}")
+            (project_dir / "index.html").write_text(
+                '<link href="../shared.css"><a href="assets">Assets</a>'
+            )
+
+            assert check_missing_files_in_project(project_dir) == {}
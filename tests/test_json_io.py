@@ -0,0 +1,71 @@
+"""
+Tests for the shared JSON helpers in scripts/utils/json_io.py.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+try:
+    import pytest  # noqa: F401
+except ImportError:
+    print("pytest not installed. Run: pip install pytest")
+    sys.exit(1)
+
+
+SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from utils.json_io import dumps, loads, write_json_atomic  # noqa: E402
+
+
+class TestDumpsLoads:
+    """Test encoding and decoding round trips."""
+
+    def test_dumps_returns_bytes(self):
+        """Should return UTF-8 encoded bytes."""
+        assert isinstance(dumps({"a": 1}), bytes)
+
+    def test_round_trip(self):
+        """Should decode what it encodes, including non-ASCII text."""
+        obj = {"title": "Café ☕", "tags": ["a", "b"], "n": 3, "none": None}
+        assert loads(dumps(obj)) == obj
+        assert loads(dumps(obj, indent=True)) == obj
+
+    def test_compact_output_is_single_line(self):
+        """Compact output must be usable as one line of a JSON stream."""
+        assert b"\n" not in dumps({"text": "line1\nline2"})
+
+    def test_newline_appends_single_line_terminator(self):
+        """newline=True should end compact output with exactly one newline."""
+        data = dumps({"text": "line1\nline2"}, newline=True)
+        assert data.endswith(b"\n") and data.count(b"\n") == 1
+        assert loads(data) == {"text": "line1\nline2"}
+
+    def test_loads_accepts_str(self):
+        """Should accept str as well as bytes."""
+        assert loads('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+class TestWriteJsonAtomic:
+    """Test atomic JSON file writes."""
+
+    def test_writes_readable_json(self):
+        """Should write a file that the standard library can parse."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            target = Path(tmpdir) / "state.json"
+            write_json_atomic(target, {"percentage": 50})
+
+            assert json.loads(target.read_text()) == {"percentage": 50}
+
+    def test_replaces_existing_file_without_leftovers(self):
+        """Should overwrite the target and leave no temp files behind."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            target = Path(tmpdir) / "state.json"
+            target.write_text("old")
+
+            payload = write_json_atomic(target, {"percentage": 100})
+
+            assert target.read_bytes() == payload
+            assert [p.name for p in Path(tmpdir).iterdir()] == ["state.json"]
@@ -0,0 +1,165 @@
+"""
+Behaviour tests for message_loop() in scripts/research-agent.py.
+
+These tests load the real script through the agent fixture in conftest.py;
+message_loop itself only needs an object with an async generate_str().
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import pytest
+except ImportError:
+    print("pytest not installed. Run: pip install pytest")
+    sys.exit(1)
+
+
+class FakeLLM:
+    def __init__(self, failures=0):
+        self.prompts = []
+        self.failures = failures
+
+    async def generate_str(self, message, request_params):
+        self.prompts.append(message)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("rate limited")
+        return "Follow-up answer"
+
+
+def _failing_awatch(*args, **kwargs):
+    """Stand-in for watchfiles.awatch whose watcher dies on first use."""
+
+    async def changes():
+        raise RuntimeError("watch limit reached")
+        yield  # pragma: no cover - makes this an async generator
+
+    return changes()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _run_message_loop(agent, llm, project_dir, messages, expected_prompts):
+    """
+    Run message_loop until llm has been prompted expected_prompts times.
+
+    The messages are written to .messages.json once the loop is running,
+    then the loop is stopped through the kill file.
+    """
+
+    async def driver():
+        # Let the loop start (and any failing watcher fail) first
+        await asyncio.sleep(0.1)
+        (Path(project_dir) / ".messages.json").write_text(json.dumps(messages))
+        for _ in range(200):
+            if len(llm.prompts) >= expected_prompts:
+                break
+            await asyncio.sleep(0.02)
+        (Path(project_dir) / ".kill").touch()
+
+    async def run():
+        await asyncio.wait_for(
+            asyncio.gather(agent.message_loop(llm, project_dir), driver()),
+            timeout=10,
+        )
+
+    asyncio.run(run())
+
+
+class TestMessageLoopWatcherFailure:
+    """message_loop should keep serving follow-ups when the watcher fails."""
+
+    def test_falls_back_to_polling_when_watcher_raises(self, agent, monkeypatch):
+        events = []
+        monkeypatch.setattr(agent, "emit_event", events.append)
+        monkeypatch.setattr(agent, "awatch", _failing_awatch)
+        monkeypatch.setattr(agent, "_MESSAGE_POLL_SECONDS", 0.02)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = str(Path(tmpdir).resolve())
+            messages_file = Path(project_dir) / ".messages.json"
+            llm = FakeLLM()
+
+            _run_message_loop(
+                agent,
+                llm,
+                project_dir,
+                [{"id": "m1", "content": "More please", "timestamp": 0}],
+                expected_prompts=1,
+            )
+
+            assert len(llm.prompts) == 1
+            assert "More please" in llm.prompts[0]
+            # The processed flag is written by the background writer thread
+            assert _wait_for(
+                lambda: json.loads(messages_file.read_text())[0].get("processed")
+            )
+
+        types_seen = [event["type"] for event in events]
+        assert "message_processed" in types_seen
+        assert "message_loop_error" not in types_seen
+        assert any(
+            event["type"] == "log" and "polling" in event["message"]
+            for event in events
+        )
+        assert events[-1] == {
+            "type": "log",
+            "message": "Received kill signal. Exiting message loop.",
+        }
+
+
+class TestMessageLoopFailedMessage:
+    """A failed follow-up must not drop the messages queued behind it."""
+
+    def test_messages_after_a_failure_are_processed(self, agent, monkeypatch):
+        events = []
+        monkeypatch.setattr(agent, "emit_event", events.append)
+        monkeypatch.setattr(agent, "awatch", None)
+        monkeypatch.setattr(agent, "_MESSAGE_POLL_SECONDS", 0.02)
+        monkeypatch.setattr(agent, "_MESSAGE_ERROR_RETRY_SECONDS", 0.02)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            project_dir = str(Path(tmpdir).resolve())
+            messages_file = Path(project_dir) / ".messages.json"
+            llm = FakeLLM(failures=1)
+
+            _run_message_loop(
+                agent,
+                llm,
+                project_dir,
+                [
+                    {"id": "a", "content": "First question", "timestamp": 0},
+                    {"id": "b", "content": "Second question", "timestamp": 1},
+                ],
+                expected_prompts=2,
+            )
+
+            assert len(llm.prompts) == 2
+            assert "First question" in llm.prompts[0]
+            assert "Second question" in llm.prompts[1]
+            # The processed flag is written by the background writer thread
+            assert _wait_for(
+                lambda: json.loads(messages_file.read_text())[1].get("processed")
+            )
+            assert not json.loads(messages_file.read_text())[0].get("processed")
+
+        errors = [event for event in events if event["type"] == "message_loop_error"]
+        assert [event["error"] for event in errors] == ["rate limited"]
+        processed = [
+            event["message_id"]
+            for event in events
+            if event["type"] == "message_processed"
+        ]
+        assert processed == ["b"]
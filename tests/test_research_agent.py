@@ -8,6 +8,8 @@ These tests verify that:
 4. The script structure is correct
 """
 
+import asyncio
+import os
 import sys
 from pathlib import Path
 import ast
@@ -127,9 +129,9 @@ class TestResearchAgentImports:
         assert "asyncio" in imports, "Must import asyncio"
 
     def test_imports_json(self):
-        """Should import json."""
+        """Should import the shared JSON helpers."""
         imports = self.get_imports()
-        assert "json" in imports, "Must import json"
+        assert "utils.json_io" in imports, "Must import utils.json_io"
 
 
 class TestResearchAgentAPI:
@@ -198,20 +200,84 @@ class TestResearchAgentStructure:
             "Must use RequestParams for configuring LLM parameters"
         )
 
-    def test_changes_directory_before_agent(self):
-        """Should change to project directory before creating agent."""
+    def test_does_not_change_directory(self):
+        """Should leave the process CWD alone and pass the project dir explicitly."""
         source = RESEARCH_AGENT_PATH.read_text()
-        # Check that os.chdir is called before Agent creation
-        chdir_pos = source.find("os.chdir(project_dir)")
-        agent_pos = source.find("Agent(")
-
-        assert chdir_pos != -1, "Must call os.chdir(project_dir)"
-        assert agent_pos != -1, "Must create Agent instance"
-        assert chdir_pos < agent_pos, (
-            "Must call os.chdir(project_dir) BEFORE creating Agent"
+        assert "os.chdir(" not in source, (
+            "Must not change the process-wide CWD (breaks concurrent runs)"
         )
 
 
+class TestFilesystemServerConfig:
+    """Test the filesystem server settings run_research builds."""
+
+    def test_passes_project_dir_to_filesystem_server(
+        self, agent, monkeypatch, tmp_path
+    ):
+        """The project dir is the server's allowed directory; CWD is untouched."""
+        settings = []
+
+        class StopBeforeApp(Exception):
+            pass
+
+        def capture_settings(**config):
+            settings.append(config)
+            raise StopBeforeApp
+
+        monkeypatch.setattr(agent, "Settings", capture_settings)
+        monkeypatch.setattr(agent, "configure_logging", lambda: None)
+        monkeypatch.setattr(agent.ToolCallHandler, "project_dir", None)
+        cwd = os.getcwd()
+
+        with pytest.raises(StopBeforeApp):
+            asyncio.run(agent.run_research("topic", str(tmp_path)))
+
+        args = settings[0]["mcp"]["servers"]["filesystem"]["args"]
+        assert args[-2].endswith("filesystem-server.py")
+        assert args[-1] == str(tmp_path)
+        assert os.getcwd() == cwd
+
+
+class TestMainProjectDir:
+    """Test how main() normalizes the project directory argument."""
+
+    def _run_main(self, agent, monkeypatch, project_arg):
+        """Run main() with a stubbed run_research; return its project_dir."""
+        calls = []
+
+        async def fake_run_research(**kwargs):
+            calls.append(kwargs)
+            return {"success": True}
+
+        monkeypatch.setattr(agent, "run_research", fake_run_research)
+        monkeypatch.setattr(sys, "argv", ["research-agent.py", "topic", project_arg])
+        with pytest.raises(SystemExit) as exit_info:
+            agent.main()
+
+        assert exit_info.value.code == 0
+        assert len(calls) == 1
+        return calls[0]["project_dir"]
+
+    def test_absolute_project_dir_is_normalized(self, agent, monkeypatch, tmp_path):
+        """'/x/./proj/' must become '/x/proj' so watcher paths compare equal."""
+        project_arg = f"{tmp_path}{os.sep}.{os.sep}proj{os.sep}"
+
+        project_dir = self._run_main(agent, monkeypatch, project_arg)
+
+        assert project_dir == str(tmp_path / "proj")
+        assert (tmp_path / "proj").is_dir()
+
+    def test_relative_project_dir_is_made_absolute(
+        self, agent, monkeypatch, tmp_path
+    ):
+        """Relative project dirs resolve against the current directory."""
+        monkeypatch.chdir(tmp_path)
+
+        project_dir = self._run_main(agent, monkeypatch, f"a{os.sep}..{os.sep}proj")
+
+        assert project_dir == str(tmp_path / "proj")
+
+
 class TestAutoModelHandling:
     """Test that 'auto' model name is properly handled."""
 
@@ -0,0 +1,285 @@
+"""
+Behaviour tests for the file and stdout writers in scripts/research-agent.py.
+
+These tests load the real script through the agent fixture in conftest.py.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import sys
+import threading
+
+try:
+    import pytest
+except ImportError:
+    print("pytest not installed. Run: pip install pytest")
+    sys.exit(1)
+
+
+def _read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestActivityLog:
+    """Test the append-only .activities.jsonl writer."""
+
+    @pytest.fixture
+    def small_limits(self, agent, monkeypatch):
+        """Cap the log at 5 activities, trimmed once it passes 7."""
+        monkeypatch.setitem(agent.PROGRESS_LIMITS, "ACTIVITY_MAX_COUNT", 5)
+        monkeypatch.setitem(agent.PROGRESS_LIMITS, "ACTIVITY_COMPACT_INTERVAL", 2)
+
+    def test_appends_one_json_object_per_line(self, agent, tmp_path):
+        """Each activity is written as one JSON line, in order."""
+        log = agent.ActivityLog(str(tmp_path))
+        log.append({"type": "thought", "content": "first"})
+        log.append({"type": "tool_call", "tool": "web_search", "args": {"q": "x"}})
+        log.flush()
+
+        path = tmp_path / ".activities.jsonl"
+        assert _read_jsonl(path) == [
+            {"type": "thought", "content": "first"},
+            {"type": "tool_call", "tool": "web_search", "args": {"q": "x"}},
+        ]
+
+    def test_appends_to_existing_log(self, agent, tmp_path):
+        """Opening the log keeps what an earlier run wrote."""
+        path = tmp_path / ".activities.jsonl"
+        path.write_text('{"n": 0}\n{"n": 1}\n')
+
+        log = agent.ActivityLog(str(tmp_path))
+        log.append({"n": 2})
+        log.flush()
+
+        assert _read_jsonl(path) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    def test_trims_to_max_count_after_overshoot(self, agent, tmp_path, small_limits):
+        """The log may overshoot the cap by one interval, then keeps the newest."""
+        path = tmp_path / ".activities.jsonl"
+        log = agent.ActivityLog(str(tmp_path))
+
+        for n in range(7):
+            log.append({"n": n})
+        log.flush()
+        assert len(_read_jsonl(path)) == 7  # Within the overshoot, no trim yet
+
+        log.append({"n": 7})
+        log.flush()
+        assert _read_jsonl(path) == [{"n": n} for n in range(3, 8)]
+
+        # Appends continue after a trim
+        log.append({"n": 8})
+        log.flush()
+        assert _read_jsonl(path) == [{"n": n} for n in range(3, 9)]
+
+    def test_counts_existing_lines_when_opened(self, agent, tmp_path, small_limits):
+        """Lines written by an earlier run count towards the cap."""
+        path = tmp_path / ".activities.jsonl"
+        path.write_text("".join(json.dumps({"n": n}) + "\n" for n in range(7)))
+
+        log = agent.ActivityLog(str(tmp_path))
+        log.append({"n": 7})
+        log.flush()
+
+        assert _read_jsonl(path) == [{"n": n} for n in range(3, 8)]
+
+
+class _FakeStdout:
+    """Records each write to stdout's binary buffer."""
+
+    def __init__(self):
+        self.buffer = self
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+
+    def flush(self):
+        pass
+
+    def events(self):
+        lines = b"".join(self.writes).splitlines()
+        return [json.loads(line) for line in lines]
+
+
+def _capture_stdout(monkeypatch):
+    # Patched inside the test itself: pytest's own capture resets sys.stdout
+    # between fixture setup and the test call
+    fake = _FakeStdout()
+    monkeypatch.setattr(sys, "stdout", fake)
+    return fake
+
+
+class TestProtocolEmitter:
+    """Test the batching writer every stdout protocol event goes through."""
+
+    def test_one_write_per_loop_step(self, agent, monkeypatch):
+        """Events emitted in one event-loop step share a single write."""
+        stdout = _capture_stdout(monkeypatch)
+        emitter = agent.ProtocolEmitter()
+
+        async def run():
+            for n in range(3):
+                emitter.emit({"type": "log", "n": n})
+            assert stdout.writes == []  # Nothing written until the step ends
+            await asyncio.sleep(0)
+            assert len(stdout.writes) == 1
+            emitter.emit({"type": "log", "n": 3})
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        assert len(stdout.writes) == 2
+        assert stdout.events() == [{"type": "log", "n": n} for n in range(4)]
+
+    def test_writes_immediately_without_event_loop(self, agent, monkeypatch):
+        """With no running loop, each event is written straight away."""
+        stdout = _capture_stdout(monkeypatch)
+        emitter = agent.ProtocolEmitter()
+
+        emitter.emit({"type": "log", "n": 0})
+        assert stdout.events() == [{"type": "log", "n": 0}]
+        emitter.emit({"type": "log", "n": 1})
+        assert len(stdout.writes) == 2
+
+    def test_flush_from_other_thread_while_scheduled(self, agent, monkeypatch):
+        """A flush from another thread neither loses nor duplicates events."""
+        stdout = _capture_stdout(monkeypatch)
+        emitter = agent.ProtocolEmitter()
+
+        async def run():
+            emitter.emit({"n": 0})  # Schedules a flush on the loop
+            flusher = threading.Thread(target=emitter.flush)
+            flusher.start()
+            flusher.join()
+            assert stdout.events() == [{"n": 0}]
+
+            # The earlier scheduled flush is still pending; new events must
+            # still get a flush of their own
+            emitter.emit({"n": 1})
+            # Events from other threads join the pending burst
+            other = threading.Thread(target=emitter.emit, args=({"n": 2},))
+            other.start()
+            other.join()
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        assert stdout.events() == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert all(stdout.writes)  # No empty writes
+
+
+class TestProgressWrites:
+    """Test how progress updates reach .research-progress.json."""
+
+    @pytest.fixture
+    def writes(self, agent, monkeypatch):
+        """Run queued writes inline and count the progress files written."""
+        written = []
+        write_json_atomic = agent.write_json_atomic
+
+        def counting_write(path, data):
+            written.append(data)
+            write_json_atomic(path, data)
+
+        monkeypatch.setattr(agent, "write_json_atomic", counting_write)
+        monkeypatch.setattr(
+            agent, "write_in_background", lambda func, *args: func(*args)
+        )
+        return written
+
+    @staticmethod
+    def _state(percentage, task):
+        return {
+            "percentage": percentage,
+            "currentTask": task,
+            "currentTaskDescription": f"Currently working on: {task}",
+            "completedTasks": [],
+        }
+
+    def _read(self, project_dir):
+        return json.loads((project_dir / ".research-progress.json").read_text())
+
+    def test_back_to_back_updates_write_latest_only(self, agent, tmp_path, writes):
+        """Updates made in one event-loop step are coalesced into one write."""
+
+        async def run():
+            await agent.update_progress(str(tmp_path), 10, "Searching", [])
+            await agent.update_progress(str(tmp_path), 20, "Reading", ["Searching"])
+            assert writes == []  # Written once the current step finishes
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        assert len(writes) == 1
+        progress = self._read(tmp_path)
+        assert progress["percentage"] == 20
+        assert progress["currentTask"] == "Reading"
+        assert progress["completedTasks"] == ["Searching"]
+
+    def test_identical_state_is_not_rewritten(self, agent, tmp_path, writes):
+        """Re-sending the last written state leaves the file alone."""
+        state = self._state(40, "Writing")
+        agent.write_progress(str(tmp_path), state)
+        first = self._read(tmp_path)
+
+        agent.write_progress(str(tmp_path), dict(state))
+
+        assert len(writes) == 1
+        assert self._read(tmp_path) == first
+
+        agent.write_progress(str(tmp_path), self._state(50, "Writing"))
+        assert len(writes) == 2
+
+    def test_external_write_forces_rewrite(self, agent, tmp_path, writes):
+        """If another process replaced the file, the state is written again."""
+        state = self._state(40, "Writing")
+        agent.write_progress(str(tmp_path), state)
+
+        # The filesystem server's update_research_progress replaces the file
+        external = tmp_path / "external.json"
+        external.write_text(json.dumps({"percentage": 60, "currentTask": "Other"}))
+        os.replace(external, tmp_path / ".research-progress.json")
+
+        agent.write_progress(str(tmp_path), dict(state))
+
+        assert len(writes) == 2
+        assert self._read(tmp_path)["percentage"] == 40
+
+    def test_external_write_with_same_mtime_and_size(self, agent, tmp_path, writes):
+        """A replaced file is rewritten even if its mtime and size match ours."""
+        state = self._state(40, "Writing")
+        agent.write_progress(str(tmp_path), state)
+        progress_file = tmp_path / ".research-progress.json"
+        ours = progress_file.read_bytes()
+        st = os.stat(progress_file)
+
+        # Same size and mtime tick, but written (and replaced) by another process
+        external = tmp_path / "external.json"
+        external.write_bytes(ours.replace(b"Writing", b"Waiting"))
+        os.utime(external, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(external, progress_file)
+
+        agent.write_progress(str(tmp_path), dict(state))
+
+        assert len(writes) == 2
+        assert self._read(tmp_path)["currentTask"] == "Writing"
+
+    def test_stop_writer_flushes_pending_progress(self, agent, tmp_path, monkeypatch):
+        """Progress queued in the last event-loop step is written at exit."""
+        # Use a private writer thread and queue so stopping it here doesn't
+        # stop the one other tests share
+        monkeypatch.setattr(agent, "_writer", None)
+        monkeypatch.setattr(agent, "_write_queue", queue.SimpleQueue())
+
+        async def run():
+            await agent.update_progress(str(tmp_path), 70, "Summarizing", [])
+            # Exit before the scheduled flush gets a chance to run
+            agent._stop_writer()
+
+        asyncio.run(run())
+
+        assert not agent._writer.is_alive()
+        assert self._read(tmp_path)["currentTask"] == "Summarizing"